@@ -0,0 +1,115 @@
+"""
+throughput of validated routes with slow upstream calls, ASGI (one event
+loop) compared with WSGI (thread pool), requires Falcon 3+
+
+    python -m benchmarks.bench_asgi --requests 400 --latency 0.02
+"""
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Query(BaseModel):
+    text: str
+
+
+class Response(BaseModel):
+    label: int
+
+
+def make_wsgi_app(latency):
+    api = Falibrary()
+
+    class Predict:
+        @api.validate(query=Query, resp=Response)
+        def on_get(self, req, resp):
+            time.sleep(latency)
+            return Response(label=len(req.context.query.text))
+
+    app = getattr(falcon, 'App', falcon.API)()
+    app.add_route('/predict', Predict())
+    api.register(app)
+    return app
+
+
+def make_asgi_app(latency):
+    from falcon.asgi import App
+
+    api = Falibrary()
+
+    class Predict:
+        @api.validate(query=Query, resp=Response)
+        async def on_get(self, req, resp):
+            await asyncio.sleep(latency)
+            return Response(label=len(req.context.query.text))
+
+    app = App()
+    app.add_route('/predict', Predict())
+    api.register(app)
+    return app
+
+
+def bench_wsgi(app, requests, concurrency):
+    client = testing.TestClient(app)
+
+    def call(_):
+        return client.simulate_get('/predict', params={'text': 'hello'}).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        codes = list(pool.map(call, range(requests)))
+    assert set(codes) == {200}
+    return time.perf_counter() - start
+
+
+def bench_asgi(app, requests, concurrency):
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        async with testing.ASGIConductor(app) as conductor:
+            async def call():
+                async with semaphore:
+                    result = await conductor.simulate_get(
+                        '/predict', params={'text': 'hello'})
+                    return result.status_code
+
+            start = time.perf_counter()
+            codes = await asyncio.gather(*(call() for _ in range(requests)))
+            assert set(codes) == {200}
+            return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='simulated upstream latency in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64, 256])
+    args = parser.parse_args()
+
+    try:
+        import falcon.asgi  # noqa: F401
+    except ImportError:
+        sys.exit('ASGI requires Falcon 3+')
+
+    wsgi, asgi = make_wsgi_app(args.latency), make_asgi_app(args.latency)
+    print(f'{args.requests} requests, {args.latency * 1000:.0f}ms upstream latency')
+    print(f'{"concurrency":>12} {"WSGI req/s":>12} {"ASGI req/s":>12}')
+    for concurrency in args.concurrency:
+        wsgi_cost = bench_wsgi(wsgi, args.requests, concurrency)
+        asgi_cost = bench_asgi(asgi, args.requests, concurrency)
+        print(f'{concurrency:>12} {args.requests / wsgi_cost:>12.0f}'
+              f' {args.requests / asgi_cost:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+batch (column-wise) validation compared with one model per row
+
+    python -m benchmarks.bench_batch
+"""
+import time
+import argparse
+
+from pydantic import BaseModel, Field
+
+from falibrary.batch import BatchValidator
+
+
+class Record(BaseModel):
+    uid: int = Field(..., ge=0)
+    name: str = Field(..., max_length=32)
+    score: float = Field(..., ge=0, le=1)
+    count: int = 0
+    vip: bool = False
+
+
+def make_rows(size):
+    return [{
+        'uid': i,
+        'name': f'user-{i}',
+        'score': (i % 100) / 100,
+        'count': i % 7,
+        'vip': i % 2 == 0,
+    } for i in range(size)]
+
+
+def timing(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    validator = BatchValidator(Record)
+    print(f'{"rows":>8} {"per-row":>10} {"batch":>10} {"columns":>10}')
+    for size in args.sizes:
+        rows = make_rows(size)
+        per_row = timing(lambda: [Record.parse_obj(row) for row in rows], args.repeat)
+        batch = timing(lambda: validator.validate_rows(rows), args.repeat)
+        columns = timing(lambda: validator.validate_columns(rows), args.repeat)
+        print(f'{size:>8} {per_row * 1000:>8.1f}ms {batch * 1000:>8.1f}ms'
+              f' {columns * 1000:>8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+measure ``import falibrary`` time and peak memory in fresh interpreters
+
+    python -m benchmarks.bench_import -n 20
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# NOTE tracing allocations slows the import down a lot, so time and memory
+# are measured in separate interpreters
+SNIPPET = '''
+import json, sys, time, tracemalloc
+trace = sys.argv[1] == 'memory'
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+import falibrary
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'peak_bytes': tracemalloc.get_traced_memory()[1] if trace else None,
+    'pkg_resources': 'pkg_resources' in sys.modules,
+}))
+'''
+
+
+def run(mode):
+    output = subprocess.check_output([sys.executable, '-c', SNIPPET, mode])
+    return json.loads(output)
+
+
+def measure(repeat):
+    results = [run('time') for _ in range(repeat)]
+    return results, run('memory')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results, memory = measure(args.repeat)
+    seconds = [r['seconds'] for r in results]
+    print(f'import falibrary ({args.repeat} runs)')
+    print(f'  median: {statistics.median(seconds) * 1000:.1f} ms')
+    print(f'  min:    {min(seconds) * 1000:.1f} ms')
+    print(f'  peak:   {memory["peak_bytes"] / 1024:.0f} KiB')
+    print(f'  pkg_resources imported: {memory["pkg_resources"]}')
+
+
+if __name__ == '__main__':
+    main()
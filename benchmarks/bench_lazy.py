@@ -0,0 +1,64 @@
+"""
+lazy validation of wide models compared with validating the whole model
+
+    python -m benchmarks.bench_lazy
+"""
+import time
+import argparse
+
+from pydantic import Field, create_model
+
+from falibrary.lazy import LazyValidator
+
+
+def make_model(width):
+    fields = {}
+    for i in range(width):
+        kind = (int, str, float)[i % 3]
+        fields[f'field_{i}'] = (kind, Field(...)) if i % 2 else (kind, Field(kind()))
+    return create_model(f'Wide{width}', **fields)
+
+
+def make_media(width):
+    return {
+        f'field_{i}': (i, f'value-{i}', i / 2)[i % 3] for i in range(width)
+    }
+
+
+def timing(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--widths', type=int, nargs='+', default=[100, 200, 500])
+    parser.add_argument('--access', type=int, default=3, help='fields read by responder')
+    parser.add_argument('-n', '--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f'{"fields":>8} {"full":>10} {"lazy":>10} {"lazy+all":>10}')
+    for width in args.widths:
+        model, media = make_model(width), make_media(width)
+        validator = LazyValidator(model)
+        names = [f'field_{i}' for i in range(args.access)]
+
+        def lazy():
+            data = validator(media)
+            for name in names:
+                getattr(data, name)
+
+        def lazy_all():
+            validator(media).validate_all()
+
+        full = timing(lambda: model(**media), args.number)
+        partial = timing(lazy, args.number)
+        strict = timing(lazy_all, args.number)
+        print(f'{width:>8} {full * 1e6:>8.1f}us {partial * 1e6:>8.1f}us'
+              f' {strict * 1e6:>8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
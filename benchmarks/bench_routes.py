@@ -0,0 +1,102 @@
+"""
+route traversal and spec generation for large route tables
+
+    python -m benchmarks.bench_routes
+"""
+import time
+import argparse
+
+import falcon
+from falcon.routing import CompiledRouter
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.route import DocPage, OpenAPI, AsyncDocPage, AsyncOpenAPI
+from falibrary.utils import find_routes, RouteIndex
+
+DOC_CLASS_NAME = [x.__name__ for x in (DocPage, OpenAPI, AsyncDocPage, AsyncOpenAPI)]
+
+
+def find_routes_recursive(root):
+    # NOTE the previous implementation, for comparison
+    routes = []
+
+    def find_node(node):
+        if node.resource and node.resource.__class__.__name__ not in DOC_CLASS_NAME:
+            routes.append(node)
+
+        for child in node.children:
+            find_node(child)
+
+    for route in root:
+        find_node(route)
+
+    return routes
+
+
+class DeferredRouter(CompiledRouter):
+    # NOTE Falcon 2 compiles the router on every ``add_route``, which is
+    # quadratic, compile it only once after all the routes are added
+    deferred = True
+
+    def _compile(self):
+        if self.deferred:
+            return getattr(self, '_find', None)
+        return super()._compile()
+
+
+class Query(BaseModel):
+    text: str
+
+
+def make_app(size, api):
+    class Item:
+        @api.validate(query=Query)
+        def on_get(self, req, resp, uid):
+            pass
+
+        @api.validate()
+        def on_delete(self, req, resp, uid):
+            pass
+
+    router = DeferredRouter()
+    app = falcon.API(router=router)
+    for i in range(size):
+        app.add_route(f'/v{i % 10}/tenant{i}/items/{{uid}}', Item())
+    router.deferred = False
+    router._find = router._compile()
+    return app
+
+
+def timing(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"routes":>8} {"recursive":>10} {"iterative":>10} {"index":>10} {"spec":>10}')
+    for size in args.sizes:
+        api = Falibrary()
+        app = make_app(size, api)
+        api.register(app)
+        roots = app._router._roots
+
+        recursive = timing(lambda: find_routes_recursive(roots), args.repeat)
+        iterative = timing(lambda: list(find_routes(roots)), args.repeat)
+        index = timing(lambda: RouteIndex(roots), args.repeat)
+        spec = timing(lambda: (api.invalidate(), api.spec), 1)
+        print(f'{size:>8} {recursive * 1000:>8.1f}ms {iterative * 1000:>8.1f}ms'
+              f' {index * 1000:>8.1f}ms {spec * 1000:>8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
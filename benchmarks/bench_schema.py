@@ -0,0 +1,76 @@
+"""
+schema generation for a large model graph, eager ``model.schema()`` for
+each model (the old way) compared with the lazy registry
+
+    python -m benchmarks.bench_schema --models 500
+"""
+import time
+import argparse
+from typing import List, Optional
+
+from pydantic import BaseModel, create_model
+
+from falibrary.registry import SchemaRegistry
+
+
+def make_models(count):
+    """
+    each model refers to the previous ones, like a real domain model
+    """
+    models = []
+    for i in range(count):
+        fields = {
+            'uid': (int, ...),
+            'name': (str, ...),
+            'score': (float, 0.0),
+        }
+        if models:
+            fields['parent'] = (Optional[models[i - 1]], None)
+            fields['children'] = (List[models[i // 2]], [])
+        models.append(create_model(f'Model{i}', __base__=BaseModel, **fields))
+    return models
+
+
+def eager(models):
+    schemas = {}
+    for model in models:
+        schemas[model.__name__] = model.schema()
+    return schemas
+
+
+def lazy(models):
+    registry = SchemaRegistry()
+    for model in models:
+        registry.add(model)
+    return registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', type=int, default=500)
+    args = parser.parse_args()
+
+    models = make_models(args.models)
+
+    start = time.perf_counter()
+    schemas = eager(models)
+    eager_cost = time.perf_counter() - start
+    size = sum(len(str(schema)) for schema in schemas.values())
+
+    start = time.perf_counter()
+    registry = lazy(models)
+    register_cost = time.perf_counter() - start
+    start = time.perf_counter()
+    components = registry.schemas
+    generate_cost = time.perf_counter() - start
+
+    print(f'{args.models} models')
+    print(f'  eager model.schema() at decoration: {eager_cost * 1000:10.1f} ms'
+          f'  ({size / 1024:.0f} KiB of schemas)')
+    print(f'  registry.add at decoration:         {register_cost * 1000:10.1f} ms')
+    print(f'  registry.schemas on first spec:     {generate_cost * 1000:10.1f} ms'
+          f'  ({len(str(components)) / 1024:.0f} KiB of schemas)')
+
+
+if __name__ == '__main__':
+    main()
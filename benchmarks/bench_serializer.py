@@ -0,0 +1,102 @@
+"""
+decode + validate and encode cost of each serializer on nested payloads
+
+    python -m benchmarks.bench_serializer -n 2000
+"""
+import json
+import timeit
+import argparse
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from falibrary.serializer import SERIALIZERS, get_serializer
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zipcode: str
+    country: str = 'CN'
+
+
+class LineItem(BaseModel):
+    sku: str
+    quantity: int
+    price: float
+    tags: List[str] = []
+
+
+class Customer(BaseModel):
+    uid: int
+    name: str
+    email: str
+    vip: bool
+    address: Address
+    shipping: Optional[Address] = None
+
+
+class Order(BaseModel):
+    uid: str
+    created: datetime
+    customer: Customer
+    items: List[LineItem]
+    note: Optional[str] = None
+
+
+def make_payload(items):
+    address = {'street': 'No.1 Road', 'city': 'Beijing', 'zipcode': '100000'}
+    return {
+        'uid': 'order-0001',
+        'created': '2020-01-01T12:00:00',
+        'customer': {
+            'uid': 42,
+            'name': 'Falcon',
+            'email': 'falcon@example.com',
+            'vip': True,
+            'address': address,
+            'shipping': address,
+        },
+        'items': [{
+            'sku': f'sku-{i}',
+            'quantity': i % 7 + 1,
+            'price': i * 1.5,
+            'tags': ['new', 'sale'],
+        } for i in range(items)],
+        'note': '请尽快发货',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=1000)
+    args = parser.parse_args()
+
+    for items in (1, 20, 200):
+        body = json.dumps(make_payload(items)).encode('utf-8')
+        order = Order(**json.loads(body))
+        print(f'payload with {items} items ({len(body)} bytes)')
+        for name, (_, backend) in SERIALIZERS.items():
+            if backend is None:
+                continue
+            serializer = get_serializer(name)
+            number = max(args.number // items, 10)
+            decode = min(timeit.repeat(
+                lambda: Order(**serializer.loads(body)), number=number, repeat=3,
+            )) / number
+            encode = min(timeit.repeat(
+                lambda: serializer.dump_model(order), number=number, repeat=3,
+            )) / number
+            print(f'  {name:<8} decode+validate {decode * 1e6:9.1f} us'
+                  f'  encode {encode * 1e6:9.1f} us')
+
+        number = max(args.number // items, 10)
+        media = min(timeit.repeat(
+            lambda: json.dumps(order.dict(), default=str), number=number, repeat=3,
+        )) / number
+        print(f'  {"media":<8} json.dumps(model.dict())    {media * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
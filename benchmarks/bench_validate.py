@@ -0,0 +1,97 @@
+"""
+per-request overhead of ``Falibrary.validate`` compared with an undecorated
+Falcon responder
+
+    python -m benchmarks.bench_validate -n 20000
+"""
+import json
+import timeit
+import argparse
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Query(BaseModel):
+    text: str
+    limit: int = 10
+
+
+class Data(BaseModel):
+    uid: str
+    score: float
+    tags: list = []
+
+
+class Response(BaseModel):
+    label: int
+
+
+api = Falibrary()
+
+
+class Resource:
+    def on_post(self, req, resp):
+        return Response(label=1)
+
+    @api.validate()
+    def on_post_nothing(self, req, resp):
+        return Response(label=1)
+
+    @api.validate(query=Query)
+    def on_post_query(self, req, resp):
+        return Response(label=1)
+
+    @api.validate(data=Data)
+    def on_post_data(self, req, resp):
+        return Response(label=1)
+
+    @api.validate(query=Query, data=Data, resp=Response)
+    def on_post_full(self, req, resp):
+        return Response(label=1)
+
+
+def make_environ():
+    body = json.dumps({'uid': 'abc', 'score': 0.5, 'tags': ['a', 'b']})
+    return testing.create_environ(
+        path='/bench',
+        method='POST',
+        query_string='text=hello&limit=5',
+        headers={'Content-Type': 'application/json'},
+        body=body,
+    )
+
+
+# NOTE share the options, creating them reads the system mimetypes
+OPTIONS = falcon.API()
+
+
+def bench(responder, number):
+    environ = make_environ()
+
+    def call():
+        environ['wsgi.input'].seek(0)
+        req = falcon.Request(environ, options=OPTIONS.req_options)
+        responder(req, falcon.Response(options=OPTIONS.resp_options))
+
+    return min(timeit.repeat(call, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=10000)
+    args = parser.parse_args()
+
+    resource = Resource()
+    baseline = bench(resource.on_post, args.number)
+    print(f'{"undecorated":<12} {baseline * 1e6:8.2f} us')
+    for name in ('nothing', 'query', 'data', 'full'):
+        cost = bench(getattr(resource, f'on_post_{name}'), args.number)
+        print(f'{name:<12} {cost * 1e6:8.2f} us  (+{(cost - baseline) * 1e6:.2f} us)')
+
+
+if __name__ == '__main__':
+    main()
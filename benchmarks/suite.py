@@ -0,0 +1,290 @@
+"""
+benchmark suite of the hot paths, requests go through a real Falcon app
+in-process
+
+    python -m benchmarks                              # run all the cases
+    python -m benchmarks -k spec -o result.json       # cases matching 'spec'
+    python -m benchmarks --baseline result.json       # compare with a result
+    python -m benchmarks -k validate --profile cprofile --profile-dir prof
+
+the ``bench_*`` scripts are focused comparisons of one feature, the cases
+here reuse their fixtures
+"""
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import timeit
+import cProfile
+import argparse
+import platform
+import tracemalloc
+from collections import OrderedDict
+
+import falcon
+import pydantic
+from falcon import testing
+from pydantic import create_model, Field
+
+import falibrary
+from falibrary import Falibrary
+from falibrary.utils import parse_path, cache_clear
+
+from benchmarks import bench_validate, bench_routes, bench_import
+
+# name -> (setup, self_timed)
+CASES = OrderedDict()
+
+
+def case(name, self_timed=False):
+    """
+    register a benchmark case
+
+    the decorated function sets up the fixture and returns the function to
+    be timed, if ``self_timed``, the returned function measures itself and
+    returns seconds
+    """
+    def decorator(setup):
+        CASES[name] = (setup, self_timed)
+        return setup
+    return decorator
+
+
+def start_response(status, headers, exc_info=None):
+    pass
+
+
+def make_call(app, **kwargs):
+    """
+    :returns: function that sends the same request to the WSGI app
+    """
+    environ = testing.create_environ(**kwargs)
+    body = environ['wsgi.input'].read()
+
+    def call():
+        environ['wsgi.input'] = io.BytesIO(body)
+        for _ in app(environ, start_response):
+            pass
+    return call
+
+
+def validate_app():
+    app = falcon.API()
+    resource = bench_validate.Resource()
+    app.add_route('/bench', resource)
+    for name in ('nothing', 'query', 'data', 'full'):
+        app.add_route(f'/bench/{name}', resource, suffix=name)
+    bench_validate.api.register(app)
+    return app
+
+
+for _name in ('undecorated', 'nothing', 'query', 'data', 'full'):
+    def _setup(name=_name):
+        path = '/bench' if name == 'undecorated' else f'/bench/{name}'
+        return make_call(
+            validate_app(), path=path, method='POST', query_string='text=hello&limit=5',
+            headers={'Content-Type': 'application/json'},
+            body=json.dumps({'uid': 'abc', 'score': 0.5, 'tags': ['a', 'b']}),
+        )
+    case(f'validate/{_name}')(_setup)
+
+
+for _width in (10, 50, 200):
+    def _setup(width=_width):
+        model = create_model(
+            f'Data{width}', **{f'field_{i}': (int, Field(..., ge=0)) for i in range(width)})
+        api = Falibrary()
+
+        class Resource:
+            @api.validate(data=model)
+            def on_post(self, req, resp):
+                pass
+
+        app = falcon.API()
+        app.add_route('/bench', Resource())
+        api.register(app)
+        return make_call(
+            app, path='/bench', method='POST',
+            headers={'Content-Type': 'application/json'},
+            body=json.dumps({f'field_{i}': i for i in range(width)}),
+        )
+    case(f'validate/fields-{_width}')(_setup)
+
+
+for _size in (100, 1000):
+    def _setup(size=_size):
+        api = Falibrary()
+        app = bench_routes.make_app(size, api)
+        api.register(app)
+
+        def call():
+            api.invalidate()
+            return api.spec
+        return call
+    case(f'spec/routes-{_size}')(_setup)
+
+
+def endpoint_app():
+    api = Falibrary()
+    app = bench_routes.make_app(100, api)
+    api.register(app)
+    return app
+
+
+@case('endpoint/doc')
+def doc_endpoint():
+    return make_call(endpoint_app(), path='/apidoc')
+
+
+@case('endpoint/spec')
+def spec_endpoint():
+    return make_call(endpoint_app(), path='/apidoc/openapi.json')
+
+
+@case('endpoint/spec-gzip')
+def spec_gzip_endpoint():
+    return make_call(
+        endpoint_app(), path='/apidoc/openapi.json', headers={'Accept-Encoding': 'gzip'})
+
+
+@case('endpoint/spec-304')
+def spec_not_modified():
+    app = endpoint_app()
+    etag = testing.TestClient(app).simulate_get('/apidoc/openapi.json').headers['etag']
+    return make_call(app, path='/apidoc/openapi.json', headers={'If-None-Match': etag})
+
+
+@case('parse_path/uncached')
+def parse_path_uncached():
+    def call():
+        cache_clear()
+        return parse_path('/api/{version}/items/{uid:int(min=1)}/{name}')
+    return call
+
+
+@case('import', self_timed=True)
+def import_time():
+    return lambda: bench_import.run('time')['seconds']
+
+
+def measure(call, self_timed, repeat):
+    """
+    :returns: seconds of one call (best of ``repeat``), number of calls
+    """
+    if self_timed:
+        return min(call() for _ in range(repeat)), 1
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number
+
+
+def profile(name, call, number, mode, directory):
+    """
+    run the case under ``cProfile`` or ``tracemalloc`` and dump the result
+    to ``directory``
+
+    :returns: path of the dump
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, name.replace('/', '-'))
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.runcall(lambda: [call() for _ in range(number)])
+        profiler.dump_stats(filename + '.prof')
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(15)
+        with open(filename + '.txt', 'w') as f:
+            f.write(stream.getvalue())
+        return filename + '.prof'
+
+    tracemalloc.start(25)
+    try:
+        for _ in range(number):
+            call()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen *>'),
+        ])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    with open(filename + '.txt', 'w') as f:
+        f.write(f'peak: {peak} bytes\n')
+        for stat in snapshot.statistics('lineno')[:15]:
+            f.write(f'{stat}\n')
+    return filename + '.txt'
+
+
+def compare(results, baseline, threshold):
+    """
+    :returns: list of (name, ratio) slower than ``1 + threshold``
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratio = result['seconds'] / base['seconds']
+        result['baseline'] = base['seconds']
+        result['ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', '--keyword', help='only run the cases containing it')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('-o', '--output', help='write the results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='ratio of slowdown reported as regression')
+    parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'])
+    parser.add_argument('--profile-dir', default='profiles')
+    parser.add_argument('-l', '--list', action='store_true', help='list the cases')
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if not args.keyword or args.keyword in name]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = OrderedDict()
+    for name in names:
+        setup, self_timed = CASES[name]
+        call = setup()
+        seconds, number = measure(call, self_timed, args.repeat)
+        results[name] = {'seconds': seconds, 'number': number}
+        line = f'{name:<24} {seconds * 1e6:>12.1f} us'
+        if baseline:
+            base = baseline.get('results', {}).get(name)
+            if base:
+                line += f'  {seconds / base["seconds"]:>6.2f}x'
+        if args.profile and not self_timed:
+            line += f'  {profile(name, call, number, args.profile, args.profile_dir)}'
+        print(line, flush=True)
+
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'time': time.time(),
+                'python': platform.python_version(),
+                'falcon': falcon.__version__,
+                'pydantic': pydantic.VERSION,
+                'falibrary': falibrary.__version__,
+                'results': results,
+            }, f, indent=2)
+
+    for name, ratio in regressions:
+        print(f'regression: {name} is {ratio:.2f}x of baseline', file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,37 @@
+"""
+command line tools
+
+    python -m falibrary build-spec module:app -o openapi.json
+"""
+import sys
+import argparse
+
+from falibrary.build import find_api, build_spec
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='falibrary')
+    commands = parser.add_subparsers(dest='command')
+    build = commands.add_parser(
+        'build-spec',
+        help='generate the OpenAPI spec and its precompressed variants',
+    )
+    build.add_argument(
+        'target',
+        help='"module:attr" of the Falibrary instance or the Falcon app',
+    )
+    build.add_argument('-o', '--output', default='openapi.json')
+
+    args = parser.parse_args(argv)
+    if args.command != 'build-spec':
+        parser.print_help()
+        return 1
+
+    sys.path.insert(0, '')
+    for path in build_spec(find_api(args.target), args.output):
+        print(f'write {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
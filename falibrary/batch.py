@@ -0,0 +1,244 @@
+"""
+column-wise validation for lists of homogeneous records
+"""
+from pydantic import ValidationError, errors, Extra
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_SINGLETON
+from pydantic.types import ConstrainedInt, ConstrainedFloat, ConstrainedStr
+
+MISSING = object()
+object_setattr = object.__setattr__
+
+# field type -> accepted Python types for the fast path
+FAST_TYPES = {
+    int: (int,),
+    float: (float, int),
+    str: (str,),
+    bool: (bool,),
+}
+
+STR_CONFIG = (
+    'anystr_strip_whitespace', 'anystr_lower', 'anystr_upper',
+    'min_anystr_length', 'max_anystr_length',
+)
+
+
+def build_model(model, values, fields_set, private=False):
+    """
+    create the instance from validated values, same as ``model.construct``
+    with all the defaults filled
+
+    :param private: the model has private attributes
+    """
+    instance = model.__new__(model)
+    object_setattr(instance, '__dict__', values)
+    object_setattr(instance, '__fields_set__', fields_set)
+    if private:
+        instance._init_private_attributes()
+    return instance
+
+
+def allow_inf_nan(kind, config):
+    """
+    check if ``inf`` and ``nan`` are valid for the float type, the type
+    setting overrides ``Config.allow_inf_nan`` (same as pydantic)
+    """
+    allow = getattr(kind, 'allow_inf_nan', None)
+    if allow is None:
+        allow = getattr(config, 'allow_inf_nan', True)
+    return allow
+
+
+class Column:
+    """
+    compiled checks for one model field
+
+    values with exactly the expected Python type are checked here in a
+    tight loop, the others go through ``ModelField.validate`` so the result
+    is the same as pydantic
+    """
+
+    def __init__(self, model, field):
+        self.field = field
+        self.name = field.name
+        self.alias = field.alias
+        self.required = field.required
+        self.accept = None
+        self.bounds = []
+        self.min_length = self.max_length = None
+
+        if field.shape != SHAPE_SINGLETON or field.class_validators or field.allow_none:
+            return
+        if field.field_info.const:
+            return
+
+        config = model.__config__
+        kind = field.outer_type_
+        # NOTE ``Literal``, ``Union`` and other typing forms are not classes
+        if not isinstance(kind, type):
+            return
+        is_float = kind is float or issubclass(kind, ConstrainedFloat)
+        if is_float and not allow_inf_nan(kind, config):
+            return
+        if kind in FAST_TYPES:
+            if kind is str and any(getattr(config, name, None) for name in STR_CONFIG):
+                return
+            self.accept = FAST_TYPES[kind]
+        elif issubclass(kind, (ConstrainedInt, ConstrainedFloat)):
+            if kind.strict or kind.multiple_of is not None:
+                return
+            self.accept = (int,) if issubclass(kind, ConstrainedInt) else (float, int)
+            for limit, error, compare in (
+                ('gt', errors.NumberNotGtError, lambda v, x: v > x),
+                ('ge', errors.NumberNotGeError, lambda v, x: v >= x),
+                ('lt', errors.NumberNotLtError, lambda v, x: v < x),
+                ('le', errors.NumberNotLeError, lambda v, x: v <= x),
+            ):
+                value = getattr(kind, limit)
+                if value is not None:
+                    self.bounds.append((value, error, compare))
+        elif issubclass(kind, ConstrainedStr):
+            settings = (
+                kind.regex, kind.strip_whitespace, kind.to_lower, kind.strict,
+                getattr(kind, 'to_upper', False), kind.curtail_length,
+            )
+            if any(settings) or any(getattr(config, name, None) for name in STR_CONFIG):
+                return
+            self.accept = (str,)
+            self.min_length = kind.min_length
+            self.max_length = kind.max_length
+
+    def validate(self, model, values, errs):
+        """
+        validate a column in place
+
+        :param values: list of raw values, ``MISSING`` for absent keys
+        :param errs: list to collect ``ErrorWrapper``
+        """
+        field, alias, accept = self.field, self.alias, self.accept
+        bounds, min_length, max_length = self.bounds, self.min_length, self.max_length
+        for index, value in enumerate(values):
+            if value is MISSING:
+                if self.required:
+                    errs.append(ErrorWrapper(errors.MissingError(), loc=(index, alias)))
+                else:
+                    values[index] = field.get_default()
+                continue
+
+            if accept and type(value) in accept:
+                error = None
+                for limit, error_cls, compare in bounds:
+                    if not compare(value, limit):
+                        error = error_cls(limit_value=limit)
+                        break
+                if min_length is not None and len(value) < min_length:
+                    error = errors.AnyStrMinLengthError(limit_value=min_length)
+                elif max_length is not None and len(value) > max_length:
+                    error = errors.AnyStrMaxLengthError(limit_value=max_length)
+
+                if error is None:
+                    if accept[0] is float:
+                        values[index] = float(value)
+                else:
+                    errs.append(ErrorWrapper(error, loc=(index, alias)))
+                continue
+
+            value, error = field.validate(value, {}, loc=(index, alias), cls=model)
+            if error:
+                errs.append(error)
+            else:
+                values[index] = value
+
+
+class BatchValidator:
+    """
+    validate a list of records against the model column by column
+
+    models with root validators, field validators (they may read the other
+    fields of the row), ``validate_all`` or non-default ``extra`` handling
+    are validated row by row
+
+    :param model: ``pydantic.BaseModel`` of each record
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = [Column(model, field) for field in model.__fields__.values()]
+        config = model.__config__
+        self.per_row = any((
+            model.__pre_root_validators__,
+            model.__post_root_validators__,
+            config.extra != Extra.ignore,
+            config.validate_all,
+            any(field.class_validators for field in model.__fields__.values()),
+        ))
+
+    def validate_columns(self, rows):
+        """
+        :returns: dict of field name -> list of validated values
+        :raises pydantic.ValidationError: with ``(index, field)`` locations
+        """
+        if not isinstance(rows, list):
+            raise ValidationError(
+                [ErrorWrapper(errors.ListError(), loc='__root__')], self.model)
+
+        if self.per_row:
+            return self.to_columns(self.validate_rows(rows))
+
+        errs = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errs.append(ErrorWrapper(errors.DictError(), loc=(index,)))
+        if errs:
+            raise ValidationError(errs, self.model)
+
+        columns = {}
+        for column in self.columns:
+            alias = column.alias
+            values = [row.get(alias, MISSING) for row in rows]
+            column.validate(self.model, values, errs)
+            columns[column.name] = values
+
+        if errs:
+            errs.sort(key=lambda err: err.loc_tuple()[0])
+            raise ValidationError(errs, self.model)
+        return columns
+
+    def validate_rows(self, rows):
+        """
+        :returns: list of model instances
+        :raises pydantic.ValidationError: with ``(index, field)`` locations
+        """
+        if not isinstance(rows, list):
+            raise ValidationError(
+                [ErrorWrapper(errors.ListError(), loc='__root__')], self.model)
+
+        if self.per_row:
+            models, errs = [], []
+            for index, row in enumerate(rows):
+                try:
+                    models.append(self.model.parse_obj(row))
+                except ValidationError as err:
+                    errs.append(ErrorWrapper(err, loc=index))
+            if errs:
+                raise ValidationError(errs, self.model)
+            return models
+
+        columns = self.validate_columns(rows)
+        names = list(columns)
+        records = zip(*columns.values()) if names else [()] * len(rows)
+        aliases = {column.alias: column.name for column in self.columns}
+        model = self.model
+        private = bool(model.__private_attributes__)
+        return [
+            build_model(
+                model, dict(zip(names, values)),
+                {aliases[key] for key in row if key in aliases}, private)
+            for row, values in zip(rows, records)
+        ]
+
+    def to_columns(self, models):
+        return {
+            column.name: [getattr(model, column.name) for model in models]
+            for column in self.columns
+        }
@@ -0,0 +1,171 @@
+"""
+build the OpenAPI spec ahead of time and load it at startup
+"""
+import os
+import re
+import mmap
+import time
+import warnings
+import importlib
+
+import falcon
+
+from falibrary.route import StaticBody, OpenAPI, brotli, dump_spec
+from falibrary.utils import iter_nodes
+
+FINGERPRINT = 'x-fingerprint'
+# NOTE the fingerprint is the last key of the compact JSON written by
+# :func:`build_spec`, so it can be checked without parsing the spec
+FINGERPRINT_TAIL = re.compile(rb'"x-fingerprint":"(?P<value>[0-9a-f]{40})"\}$')
+# file suffix -> content encoding of the precompressed spec files
+SUFFIXES = {'.gz': 'gzip', '.br': 'br'}
+# seconds to wait for another process building the shared spec
+LOCK_TIMEOUT = 60
+
+
+def find_api(target):
+    """
+    import ``module:attr`` and get the :class:`falibrary.Falibrary` instance
+
+    :param target: the attr can be the ``Falibrary`` instance or the Falcon
+        app it's registered to
+    """
+    from falibrary.library import Falibrary
+
+    module_name, _, attr = target.partition(':')
+    assert attr, 'target should be "module:attr"'
+    obj = importlib.import_module(module_name)
+    for name in attr.split('.'):
+        obj = getattr(obj, name)
+
+    if isinstance(obj, Falibrary):
+        assert obj.app, f'{target} is not registered to a Falcon app'
+        return obj
+
+    for node in iter_nodes(obj._router._roots):
+        if isinstance(node.resource, OpenAPI):
+            return node.resource.api
+    raise ValueError(f'no Falibrary registered to {target}')
+
+
+def write_atomic(path, content):
+    """
+    write to a temporary file and rename it, so readers never see a
+    partially written file
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def build_spec(api, output):
+    """
+    write the spec with route fingerprint and its precompressed variants
+
+    :param output: path of the JSON file, variants are written to
+        ``{output}.gz`` and ``{output}.br`` (if brotli is installed)
+    :returns: list of written files
+    """
+    spec = dict(api.spec)
+    spec[FINGERPRINT] = api.fingerprint()
+    body = StaticBody(dump_spec(spec), falcon.MEDIA_JSON)
+
+    # NOTE the JSON file is written last, once it's there the variants are
+    # ready too
+    files = []
+    for suffix, encoding in SUFFIXES.items():
+        if encoding in body.variants:
+            write_atomic(output + suffix, body.variants[encoding])
+            files.append(output + suffix)
+    write_atomic(output, body.variants['identity'])
+    return [output] + files
+
+
+def map_file(path):
+    """
+    map the file into memory read-only, the pages are shared by all the
+    processes mapping the same file
+    """
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_fingerprint(path):
+    """
+    get the fingerprint of the spec file built by :func:`build_spec`
+
+    :returns: ``None`` if the file doesn't exist or has no fingerprint
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 64, 0))
+            match = FINGERPRINT_TAIL.search(f.read())
+    except FileNotFoundError:
+        return None
+    return match.group('value').decode() if match else None
+
+
+def load_spec(api, path):
+    """
+    map the spec built by :func:`build_spec` into memory, warn if the
+    fingerprint of ``api`` has changed since then
+
+    :returns: :class:`falibrary.route.StaticBody`
+    """
+    if read_fingerprint(path) != api.fingerprint():
+        warnings.warn(
+            f'routes, models or config have changed since {path} was built, '
+            'run `python -m falibrary build-spec` again',
+            RuntimeWarning,
+        )
+
+    variants = {}
+    for suffix, encoding in SUFFIXES.items():
+        if encoding == 'br' and brotli is None:
+            continue
+        if os.path.isfile(path + suffix):
+            variants[encoding] = map_file(path + suffix)
+    return StaticBody(map_file(path), falcon.MEDIA_JSON, variants)
+
+
+def shared_spec(api, path, timeout=LOCK_TIMEOUT, force=False):
+    """
+    build the spec into ``path`` once for all the processes and map it
+
+    the process that creates ``{path}.lock`` builds the spec, the others
+    wait for it, the file is built again if the fingerprint has changed
+
+    :param timeout: seconds to wait before taking over the lock of a
+        process that may have died
+    :param force: build it even if the fingerprint is the same
+    :returns: :class:`falibrary.route.StaticBody`
+    """
+    fingerprint = api.fingerprint()
+    lock = path + '.lock'
+    deadline = time.monotonic() + timeout
+    while force or read_fingerprint(path) != fingerprint:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                warnings.warn(f'take over stale lock {lock}', RuntimeWarning)
+                try:
+                    os.remove(lock)
+                except FileNotFoundError:
+                    pass
+                deadline = time.monotonic() + timeout
+            else:
+                time.sleep(0.05)
+            continue
+
+        try:
+            # NOTE another process may finish building before the lock
+            if force or read_fingerprint(path) != fingerprint:
+                build_spec(api, path)
+                force = False
+        finally:
+            os.close(fd)
+            os.remove(lock)
+    return load_spec(api, path)
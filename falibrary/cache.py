@@ -0,0 +1,174 @@
+"""
+response cache of idempotent routes
+"""
+from time import monotonic
+from threading import Lock
+from functools import wraps
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """
+    interface of response cache backend, subclass it to store the entries
+    in other places (e.g. Redis)
+
+    keys are ``str``, values are tuples of ``str`` and ``bytes``
+    """
+
+    def get(self, key):
+        """
+        :returns: the cached value, ``None`` if it's missing or expired
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """
+        :param ttl: seconds before the entry expires, ``None`` for never
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        :returns: dict of counters
+        """
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """
+    in-process cache, the least recently used entries are evicted when it's
+    full, expired entries are dropped when they are read
+
+    :param maxsize: max number of entries
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.lock = Lock()
+        self.data = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None:
+                value, expire = item
+                if expire is None or expire > monotonic():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        expire = None if ttl is None else monotonic() + ttl
+        with self.lock:
+            self.data[key] = (value, expire)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.data),
+                'maxsize': self.maxsize,
+            }
+
+
+class ResponseCache:
+    """
+    cache of the serialized responses of one responder, keyed by the route
+    (the responder may be mounted on several routes), path params and the
+    validated ``query``
+
+    only ``200`` responses written to ``resp.data`` (models and dicts
+    returned by the responder) are cached
+
+    :param backend: :class:`CacheBackend`
+    :param ttl: seconds before the entries expire
+    :param operation: ``operationID`` of the route
+    :param serializer: serializer of the validated ``query``
+    """
+
+    def __init__(self, backend, ttl, operation, serializer):
+        self.backend = backend
+        self.ttl = ttl
+        self.operation = operation
+        self.serializer = serializer
+
+    def key(self, req, params):
+        query = getattr(req.context, 'query', None)
+        return '\n'.join((
+            self.operation,
+            req.uri_template or req.path,
+            '&'.join(f'{name}={value}' for name, value in sorted(params.items())),
+            self.serializer.dump_model(query).decode('utf-8') if query else '',
+        ))
+
+    def restore(self, key, resp):
+        """
+        :returns: if the cached response is written to ``resp``
+        """
+        value = self.backend.get(key)
+        if value is None:
+            return False
+        resp.content_type, resp.data = value
+        return True
+
+    def store(self, key, resp):
+        if resp.data is not None and str(resp.status).startswith('200'):
+            self.backend.set(key, (resp.content_type, resp.data), self.ttl)
+
+
+def cached_wrapper(func, load, dump, cache):
+    """
+    :func:`falibrary.validation.sync_wrapper` that skips the responder if
+    the response is in ``cache``
+
+    :param cache: :class:`ResponseCache`
+    """
+    @wraps(func)
+    def validation(_self, _req, _resp, *args, **kwargs):
+        if load:
+            load(_req)
+        key = cache.key(_req, kwargs)
+        if cache.restore(key, _resp):
+            return None
+        response = func(_self, _req, _resp, *args, **kwargs)
+        if dump:
+            dump(_req, _resp, response)
+        cache.store(key, _resp)
+        return response
+    return validation
+
+
+def async_cached_wrapper(func, load, dump, cache):
+    """
+    coroutine version of :func:`cached_wrapper`
+    """
+    @wraps(func)
+    async def validation(_self, _req, _resp, *args, **kwargs):
+        if load:
+            await load(_req)
+        key = cache.key(_req, kwargs)
+        if cache.restore(key, _resp):
+            return None
+        response = await func(_self, _req, _resp, *args, **kwargs)
+        if dump:
+            dump(_req, _resp, response)
+        cache.store(key, _resp)
+        return response
+    return validation
@@ -9,6 +9,56 @@ class Config:
     :ivar TITLE: service name
     :ivar VERSION: service version
     :ivar DOMAIN: service host domain
+    :ivar CACHE_CONTROL: ``Cache-Control`` header for the document page and
+        OpenAPI spec, clients can revalidate them with ``ETag``
+    :ivar MAX_BODY_SIZE: max request body size in bytes for routes with
+        ``data`` model, larger requests are rejected with ``413`` before
+        decoding (default: ``None``, no limit)
+    :ivar SERIALIZER: JSON serializer for validated routes, 'auto', 'orjson',
+        'ujson', 'json' or an object with ``loads``, ``dumps`` and
+        ``dump_model``, 'auto' picks the fastest one installed
+    :ivar SPEC_FILE: path of the spec built by ``python -m falibrary
+        build-spec``, it's served instead of generating the spec at runtime
+        (default: ``None``)
+    :ivar COLLECTOR: :class:`falibrary.metrics.Collector` to receive the
+        validation time, errors and payload size of routes decorated after
+        it's set (default: ``None``, not instrumented)
+    :ivar RESP_SAMPLE_RATE: ratio of raw responses (dict returned, or
+        ``media``/``data`` set by responder) checked against the ``resp``
+        model, it can be overridden by ``resp_sample`` of routes (default:
+        ``0``, not checked)
+    :ivar RESP_SHADOW: check the sampled responses in a background thread
+        instead of the request thread (default: ``False``)
+    :ivar RESP_VIOLATION: callback ``(operation, error)`` for responses that
+        failed the check, the request is never failed (default: ``None``,
+        emit ``RuntimeWarning``)
+    :ivar SHARED_SPEC: path of the spec file shared by the worker processes,
+        the first process to serve the spec builds it under a lock, the
+        others map the same file into memory, see
+        :meth:`falibrary.Falibrary.prebuild` (default: ``None``)
+    :ivar RESP_CACHE_BACKEND: :class:`falibrary.cache.CacheBackend` for routes
+        decorated with ``cache`` (default: ``None``, in-process LRU cache)
+    :ivar RESP_CACHE_SIZE: max entries of the in-process LRU cache
+    :ivar RESP_CACHE_TTL: seconds before the cached responses expire when
+        ``cache=True``
+    :ivar RATE_LIMIT_KEY: function to get the client key from request for
+        routes with ``rate_limit``, e.g. ``lambda req: req.remote_addr``
+        (default: ``None``, all the clients share the limit of a route)
+    :ivar SPLIT_SPEC: also serve the spec of each tag in
+        ``/{PATH}/{FILENAME stem}/{tag}.json`` with an index of tags in
+        ``/{PATH}/tags.json``, the document page loads one tag at a time
+        (default: ``False``)
+    :ivar OFFLOAD_THRESHOLD: request bodies larger than this (in bytes) are
+        decoded and validated in ``OFFLOAD_EXECUTOR``, only for routes with
+        a plain ``data`` model (not ``stream``, ``batch`` or ``lazy``), the
+        model should be defined at module level for process pool
+        (default: ``None``, never offload)
+    :ivar OFFLOAD_EXECUTOR: 'process', 'thread' (for serializers that release
+        the GIL) or a ``concurrent.futures.Executor``
+    :ivar OFFLOAD_WORKERS: number of workers of the created executor
+        (default: ``None``, decided by the executor)
+    :ivar OFFLOAD_MAX_PENDING: max number of bodies waiting or being
+        validated in the executor, more requests are rejected with ``503``
     """
 
     def __init__(self):
@@ -24,3 +74,21 @@ class Config:
         self.TITLE = 'Service API Document'
         self.VERSION = '0.1'
         self.DOMAIN = None
+        self.CACHE_CONTROL = 'no-cache'
+        self.MAX_BODY_SIZE = None
+        self.SERIALIZER = 'auto'
+        self.SPEC_FILE = None
+        self.COLLECTOR = None
+        self.RESP_SAMPLE_RATE = 0
+        self.RESP_SHADOW = False
+        self.RESP_VIOLATION = None
+        self.SHARED_SPEC = None
+        self.RESP_CACHE_BACKEND = None
+        self.RESP_CACHE_SIZE = 1024
+        self.RESP_CACHE_TTL = 60
+        self.RATE_LIMIT_KEY = None
+        self.SPLIT_SPEC = False
+        self.OFFLOAD_THRESHOLD = None
+        self.OFFLOAD_EXECUTOR = 'process'
+        self.OFFLOAD_WORKERS = None
+        self.OFFLOAD_MAX_PENDING = 16
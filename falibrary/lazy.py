@@ -0,0 +1,135 @@
+"""
+lazy validation of ``data`` models
+"""
+from pydantic import ValidationError, errors, Extra
+from pydantic.error_wrappers import ErrorWrapper
+
+from falibrary.validation import unprocessable
+
+MISSING = object()
+
+
+class LazyValidator:
+    """
+    build :class:`LazyData` for the decoded JSON body, only the presence of
+    required fields (and unknown fields if the model forbids them) is
+    checked here
+
+    models with root validators are not supported as they need all the
+    fields
+
+    :param model: ``pydantic.BaseModel`` of ``data``
+    """
+
+    def __init__(self, model):
+        assert not (model.__pre_root_validators__ or model.__post_root_validators__), \
+            f'{model.__name__} has root validators, it cannot be validated lazily'
+        self.model = model
+        self.fields = model.__fields__
+        self.required = [field for field in self.fields.values() if field.required]
+        self.by_name = model.__config__.allow_population_by_field_name
+        # NOTE field validators may read the fields defined before them in
+        # ``values``, so those are validated first
+        names = list(self.fields)
+        self.previous = {
+            name: names[:index] for index, (name, field) in enumerate(self.fields.items())
+            if field.class_validators
+        }
+        self.aliases = None
+        if model.__config__.extra == Extra.forbid:
+            self.aliases = {field.alias for field in self.fields.values()}
+            if self.by_name:
+                self.aliases.update(self.fields)
+
+    def lookup(self, media, field):
+        """
+        get the raw value of the field by alias, or by name if the model
+        allows population by field name (same as pydantic)
+        """
+        raw = media.get(field.alias, MISSING)
+        if raw is MISSING and self.by_name and field.alt_alias:
+            raw = media.get(field.name, MISSING)
+        return raw
+
+    def __call__(self, media):
+        """
+        :raises pydantic.ValidationError: if the body is not a JSON object
+            or required fields are missing
+        """
+        if not isinstance(media, dict):
+            raise ValidationError(
+                [ErrorWrapper(errors.DictError(), loc='__root__')], self.model)
+
+        errs = [
+            ErrorWrapper(errors.MissingError(), loc=field.alias)
+            for field in self.required if self.lookup(media, field) is MISSING
+        ]
+        if self.aliases is not None:
+            errs.extend(
+                ErrorWrapper(errors.ExtraError(), loc=key)
+                for key in media if key not in self.aliases
+            )
+        if errs:
+            raise ValidationError(errs, self.model)
+        return LazyData(self, media)
+
+
+class LazyData:
+    """
+    proxy of the ``data`` model, each field is validated when it's
+    accessed for the first time
+
+    a field failed validation raises HTTP 422 when it's accessed, call
+    :meth:`validate_all` to validate the whole model like before
+    """
+
+    __slots__ = ('_validator', '_media', '_values')
+
+    def __init__(self, validator, media):
+        self._validator = validator
+        self._media = media
+        self._values = {}
+
+    def __getattr__(self, name):
+        values = self._values
+        if name in values:
+            return values[name]
+
+        validator = self._validator
+        field = validator.fields.get(name)
+        if field is None:
+            raise AttributeError(
+                f'{validator.model.__name__} object has no attribute {name}')
+
+        previous = values
+        if name in validator.previous:
+            previous = {key: getattr(self, key) for key in validator.previous[name]}
+
+        raw = validator.lookup(self._media, field)
+        if raw is MISSING:
+            value = field.get_default()
+        else:
+            value, error = field.validate(
+                raw, previous, loc=field.alias, cls=validator.model)
+            if error:
+                raise unprocessable(ValidationError([error], validator.model))
+        values[name] = value
+        return value
+
+    def validate_all(self):
+        """
+        validate the whole model
+
+        :returns: the model instance
+        :raises falcon.HTTPUnprocessableEntity: if it failed validation
+        """
+        try:
+            return self._validator.model(**self._media)
+        except ValidationError as err:
+            raise unprocessable(err)
+
+    def dict(self, **kwargs):
+        return self.validate_all().dict(**kwargs)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._validator.model.__name__})'
@@ -1,30 +1,65 @@
 import re
+import json
+import hashlib
 import inspect
-from functools import wraps, partial
-from pydantic import ValidationError, BaseModel
+import posixpath
+from urllib.parse import quote
+from typing import List
+from pydantic import BaseModel
 import falcon
 
 from falibrary.config import Config
-from falibrary.route import OpenAPI, DocPage
-from falibrary.utils import find_routes, parse_path, get_summary_desc
+from falibrary.route import (
+    OpenAPI, DocPage, AsyncOpenAPI, AsyncDocPage, StaticBody, dump_spec)
+from falibrary.utils import (
+    RouteIndex, parse_path, get_summary_desc, get_class_doc, is_asgi, split_spec)
+from falibrary.serializer import get_serializer
+from falibrary.build import load_spec, shared_spec
+from falibrary.registry import SchemaRegistry, model_signature
+from falibrary.metrics import instrument, operation_id
+from falibrary.query import QueryDecoder
+from falibrary.limits import RateLimiter, limited_loader
+from falibrary.offload import Offloader
+from falibrary.cache import (
+    LRUCache, ResponseCache, cached_wrapper, async_cached_wrapper)
+from falibrary.validation import (
+    body_parser, request_loader, async_request_loader, response_dumper,
+    response_checker, sync_wrapper, async_wrapper)
+
+
+# NOTE ``falcon.API`` is renamed to ``falcon.App`` in Falcon 3, which is also
+# the base class of ``falcon.asgi.App``
+FALCON_APP = getattr(falcon, 'App', falcon.API)
+# attributes set by ``validate`` that change the operation spec
+SPEC_OPTIONS = ('x', 'tags', 'array', 'max_body', 'max_items', 'rate_limit')
 
 
 class Falibrary:
     """
-    :param app: Falcon instance [optional](you can register it later)
+    :param app: Falcon instance, WSGI ``falcon.API`` or ASGI ``falcon.asgi.App``
+        [optional](you can register it later)
     :param kwargs: key-value for config, see :class:`falibrary.config.Config`
     """
 
     def __init__(self, app=None, **kwargs):
         self.app = app
-        self.models = {}
+        self.registry = SchemaRegistry()
+        self._serializer = None
+        self._cache_backend = None
+        self.offloader = Offloader(self)
+        self._router_find = None
+        self._shared_find = None
+        self._route_index = None
+        self._index_find = None
+        self._names = None
+        self.invalidate()
         self.config = Config()
         for key, value in kwargs.items():
             setattr(self.config, key.upper(), value)
 
         self.STATUS = re.compile(r'(?P<code>^\d{3}) (?P<msg>[\w ]+$)')
         if self.app:
-            assert isinstance(app, falcon.API)
+            assert isinstance(app, FALCON_APP)
             self._register_route()
 
     def register(self, app):
@@ -33,7 +68,7 @@ class Falibrary:
 
         register this library to Falcon application to get routes
         """
-        assert isinstance(app, falcon.API)
+        assert isinstance(app, FALCON_APP)
         self.app = app
         self._register_route()
 
@@ -41,21 +76,95 @@ class Falibrary:
         """
         update config
 
-        this can be done before generate the APIspecs
+        the spec will be updated on next access
+
+        if the app is registered, changing ``PATH``, ``UI``, ``FILENAME`` or
+        ``SPLIT_SPEC`` will mount the document routes again and drop the
+        rendered page
         """
+        keys = set()
         for key, value in kwargs.items():
             setattr(self.config, key.upper(), value)
+            keys.add(key.upper())
+
+        if 'SERIALIZER' in keys:
+            self._serializer = None
+        if keys & {'RESP_CACHE_BACKEND', 'RESP_CACHE_SIZE'}:
+            self._cache_backend = None
+
+        self._spec = None
+        self._spec_body = None
+        self._tag_index = None
+        self._tag_specs = {}
+        if 'MAX_BODY_SIZE' in keys:
+            self._operations = {}
+
+        if self.app and keys & {'PATH', 'UI', 'FILENAME', 'SPLIT_SPEC'}:
+            self._register_route()
+
+    @property
+    def serializer(self):
+        """
+        JSON serializer for validated routes, see ``Config.SERIALIZER``
+        """
+        if self._serializer is None:
+            self._serializer = get_serializer(self.config.SERIALIZER)
+        return self._serializer
+
+    @property
+    def cache_backend(self):
+        """
+        backend of the response cache, see ``Config.RESP_CACHE_BACKEND``
 
-    def validate(self, query=None, data=None, resp=None, x=[], tags=[]):
+        call ``api.cache_backend.stats()`` to get the hits and misses
+        """
+        if self._cache_backend is None:
+            self._cache_backend = (
+                self.config.RESP_CACHE_BACKEND or LRUCache(self.config.RESP_CACHE_SIZE))
+        return self._cache_backend
+
+    def validate(self, query=None, data=None, resp=None, x=[], tags=[], stream=False,
+                 batch=False, resp_sample=None, cache=None, max_body=None, max_items=None,
+                 rate_limit=None, lazy=False):
         """
         validate query, JSON data, and response according to
         ``pydantic.BaseModel``
 
+        ``async def`` responders (ASGI app) are validated asynchronously,
+        ``stream`` is only supported by sync responders
+
         :param query: Schema for query args
         :param data: Schema for JSON data
-        :param response: Schema for JSON response
+        :param resp: Schema for JSON response, the responder can return an
+            instance, or an iterable of instances to stream a JSON array
+            (NDJSON if the client accepts ``application/x-ndjson``)
         :param x: List of :class:`falcon.status_codes`
         :param tags: List of string for route tags (default: Class name)
+        :param stream: JSON data is an array of ``data``, items are parsed
+            and validated one by one, ``req.context.data`` is a generator
+        :param batch: JSON data is an array of ``data`` (``List[data]`` is
+            also accepted), it's validated column by column in a single pass,
+            ``req.context.data`` is a list of models, or a dict of field name
+            -> list of values if ``batch='columns'``
+        :param resp_sample: ratio of raw responses checked against ``resp``
+            (default: ``Config.RESP_SAMPLE_RATE``), the responder can return
+            a dict or set ``resp.media``, violations are reported to
+            ``Config.RESP_VIOLATION`` without failing the request
+        :param cache: cache the serialized response of ``on_get`` responders
+            by path params and ``query``, ``True`` or TTL in seconds (default:
+            ``None``, not cached), the responder should return the response
+            instead of setting ``resp.media``, see ``Config.RESP_CACHE_*``
+        :param max_body: max request body size in bytes (default:
+            ``Config.MAX_BODY_SIZE``), checked with ``Content-Length`` before
+            reading and while reading the body
+        :param max_items: max length of the JSON array for ``stream`` and
+            ``batch``, checked before the items are validated
+        :param rate_limit: ``(limit, period)`` to allow ``limit`` requests in
+            ``period`` seconds (token bucket), others are rejected with
+            ``429`` before validation, see ``Config.RATE_LIMIT_KEY``
+        :param lazy: ``req.context.data`` is a proxy that validates each field
+            when it's accessed, missing required fields are still rejected
+            before the responder, see :class:`falibrary.lazy.LazyData`
 
         .. code-block:: python
 
@@ -76,28 +185,52 @@ class Falibrary:
                     raise falcon.HTTPUnprocessableEntity()
 
         """
+        if batch and getattr(data, '__origin__', None) in (list, List):
+            data, = data.__args__
+        if lazy:
+            assert data, 'lazy requires data model'
+            assert not (stream or batch), 'lazy is not supported by stream and batch'
+
         def decorator_validation(func):
-            @wraps(func)
-            def validation(_self, _req, _resp, *args, **kwargs):
-                try:
-                    if query:
-                        setattr(_req.context, 'query', query(**_req.params))
-                    media = _req.media or {}
-                    if data:
-                        setattr(_req.context, 'data', data(**media))
-                except ValidationError as err:
-                    raise falcon.HTTPUnprocessableEntity(
-                        'Schema failed validation',
-                        description=str(err),
-                    )
-                except Exception:
-                    raise
-
-                response = func(_self, _req, _resp, *args, **kwargs)
-                if resp:
-                    _resp.media = response.dict()
-
-                return response
+            is_async = inspect.iscoroutinefunction(func)
+            operation = operation_id(func)
+            _query = QueryDecoder(query) if query else None
+            parse = body_parser(
+                data, self, stream, batch, is_async=is_async, max_body=max_body,
+                max_items=max_items, lazy=lazy)
+            rate = self.config.RESP_SAMPLE_RATE if resp_sample is None else resp_sample
+            check = response_checker(resp, self, rate, operation)
+            dump = response_dumper(resp, self, is_async=is_async, check=check)
+            collector = self.config.COLLECTOR
+            if collector is not None:
+                _query, parse, dump = instrument(
+                    collector, operation, _query, parse, dump, is_async)
+
+            if cache:
+                assert func.__name__.startswith('on_get'), 'only GET can be cached'
+                ttl = self.config.RESP_CACHE_TTL if cache is True else cache
+                response_cache = ResponseCache(
+                    self.cache_backend, ttl, operation, self.serializer)
+
+            if rate_limit:
+                limiter = RateLimiter(*rate_limit, key=self.config.RATE_LIMIT_KEY)
+
+            if is_async:
+                load = async_request_loader(_query, parse)
+                if rate_limit:
+                    load = limited_loader(load, limiter, is_async=True)
+                if cache:
+                    validation = async_cached_wrapper(func, load, dump, response_cache)
+                else:
+                    validation = async_wrapper(func, load, dump)
+            else:
+                load = request_loader(_query, parse)
+                if rate_limit:
+                    load = limited_loader(load, limiter)
+                if cache:
+                    validation = cached_wrapper(func, load, dump, response_cache)
+                else:
+                    validation = sync_wrapper(func, load, dump)
 
             # register ``pydantic.BaseModel``
             for name, model in zip(
@@ -105,8 +238,9 @@ class Falibrary:
             ):
                 if model:
                     assert issubclass(model, BaseModel)
-                    self.models[model.__name__] = model.schema()
-                    setattr(validation, name, model.__name__)
+                    self.registry.add(model)
+                    self._spec = None
+                    setattr(validation, name, model)
 
             # handle exceptions
             code_msg = {}
@@ -121,6 +255,19 @@ class Falibrary:
             if tags:
                 validation.tags = tags
 
+            if stream or batch:
+                assert data, 'stream and batch require data model'
+                assert not (stream and batch), 'choose one of stream and batch'
+                validation.array = True
+
+            if max_body is not None:
+                validation.max_body = max_body
+            if max_items is not None:
+                assert stream or batch, 'max_items requires stream or batch'
+                validation.max_items = max_items
+            if rate_limit:
+                validation.rate_limit = rate_limit
+
             # register decorator
             validation._decorator = self
 
@@ -132,24 +279,189 @@ class Falibrary:
         register doc page and OpenAPI spec file
         """
         self.config.SPEC_URL = f'/{self.config.PATH}/{self.config.FILENAME}'
+        if hasattr(self, '_doc_page'):
+            self._doc_page.invalidate()
+        elif is_asgi(self.app):
+            self._doc_page = AsyncDocPage(self.config)
+            self._openapi = AsyncOpenAPI(self)
+        else:
+            self._doc_page = DocPage(self.config)
+            self._openapi = OpenAPI(self)
+
         self.app.add_route(
             f'/{self.config.PATH}',
-            DocPage(self.config)
+            self._doc_page
         )
         self.app.add_route(
             self.config.SPEC_URL,
-            OpenAPI(self)
+            self._openapi
         )
 
+        if self.config.SPLIT_SPEC:
+            stem = posixpath.splitext(self.config.FILENAME)[0]
+            self.config.TAGS_URL = f'/{self.config.PATH}/tags.json'
+            self.config.TAG_SPEC_URL = f'/{self.config.PATH}/{stem}/{{tag}}.json'
+            self.app.add_route(self.config.TAGS_URL, self._openapi, suffix='tags')
+            self.app.add_route(self.config.TAG_SPEC_URL, self._openapi, suffix='tag')
+
     @property
     def spec(self):
         """
         get the spec of API document
+
+        the spec is updated when routes are added, models are registered or
+        config is updated, only the changed parts are generated again
         """
-        if not hasattr(self, '_spec'):
+        if self.config.SPEC_FILE:
+            if self._spec is None:
+                self._spec = json.loads(self.spec_body.variants['identity'][:])
+        elif self._spec is None or self._router_changed():
             self._generate_spec()
         return self._spec
 
+    @property
+    def spec_body(self):
+        """
+        get the serialized spec with precompressed variants and ETag
+
+        it's memory-mapped from ``Config.SPEC_FILE`` or ``Config.SHARED_SPEC``
+        if either is set
+        """
+        if self.config.SPEC_FILE:
+            if self._spec_body is None:
+                self._spec_body = load_spec(self, self.config.SPEC_FILE)
+        elif self.config.SHARED_SPEC:
+            if self._spec_body is None or self._shared_find is not self.app._router._find:
+                self._spec_body = shared_spec(self, self.config.SHARED_SPEC)
+                self._shared_find = self.app._router._find
+        else:
+            spec = self.spec
+            if self._spec_body is None:
+                self._spec_body = StaticBody(dump_spec(spec), falcon.MEDIA_JSON)
+        return self._spec_body
+
+    @property
+    def tag_index_body(self):
+        """
+        get the serialized index of tags, see ``Config.SPLIT_SPEC``
+        """
+        spec = self.spec
+        if self._tag_index is None:
+            index = {
+                'openapi': spec['openapi'],
+                'info': spec['info'],
+                'spec': self.config.SPEC_URL,
+                'tags': [],
+            }
+            counts = {}
+            for operations in spec['paths'].values():
+                for operation in operations.values():
+                    for tag in operation.get('tags', ()):
+                        counts[tag] = counts.get(tag, 0) + 1
+            for tag in spec['tags']:
+                index['tags'].append({
+                    **tag,
+                    'url': self.config.TAG_SPEC_URL.replace(
+                        '{tag}', quote(tag['name'], safe='')),
+                    'operations': counts.get(tag['name'], 0),
+                })
+            self._tag_index = StaticBody(dump_spec(index), falcon.MEDIA_JSON)
+        return self._tag_index
+
+    def tag_spec_body(self, tag):
+        """
+        get the serialized spec of one tag, it's built on first request
+
+        :raises falcon.HTTPNotFound: if the tag is not in the spec
+        """
+        spec = self.spec
+        body = self._tag_specs.get(tag)
+        if body is None:
+            data = split_spec(spec, tag)
+            if data is None:
+                raise falcon.HTTPNotFound(
+                    title='Tag not found', description=f'no tag named {tag}')
+            body = self._tag_specs[tag] = StaticBody(dump_spec(data), falcon.MEDIA_JSON)
+        return body
+
+    def prebuild(self, path=None):
+        """
+        build the shared spec before the server forks workers, so they map
+        the same file instead of generating the spec one by one
+
+        :param path: path of the shared spec, it's set to
+            ``Config.SHARED_SPEC`` (default: ``Config.SHARED_SPEC``)
+        """
+        if path is not None:
+            self.update_config(shared_spec=path)
+        assert self.config.SHARED_SPEC, 'path of the shared spec is required'
+        # NOTE the master always builds it, in case a deploy changed anything
+        # that is not covered by :meth:`fingerprint`
+        self._spec_body = shared_spec(self, self.config.SHARED_SPEC, force=True)
+        self._shared_find = self.app._router._find
+        return self._spec_body
+
+    @property
+    def models(self):
+        """
+        schemas of registered models, name -> schema
+        """
+        return self.registry.schemas
+
+    def fingerprint(self):
+        """
+        hash of the config, routes, docs and model definitions that appear
+        in the spec, it can tell if a prebuilt spec is outdated without
+        generating the spec
+        """
+        config = self.config
+        items = [repr((
+            config.OPENAPI_VERSION, config.TITLE, config.VERSION, config.MAX_BODY_SIZE))]
+        # NOTE routes without documented methods are still in the spec
+        items.extend(route.uri_template for route in self.route_index)
+        for route, method, func in self.route_index.responders(self.bypass):
+            func = getattr(func, '__func__', func)
+            models = [
+                model_signature(getattr(func, name)) if hasattr(func, name) else ''
+                for name in ('query', 'data', 'resp')
+            ]
+            options = [
+                repr(getattr(func, name, None)) for name in SPEC_OPTIONS]
+            items.append(' '.join((
+                route.uri_template,
+                method,
+                f'{func.__module__}.{func.__qualname__}',
+                repr(func.__doc__),
+                repr(route.resource.__class__.__doc__),
+                *options,
+                *models,
+            )))
+        return hashlib.sha1('\n'.join(sorted(items)).encode('utf-8')).hexdigest()
+
+    @property
+    def route_index(self):
+        """
+        index of the routes in the app, see :class:`falibrary.utils.RouteIndex`,
+        it's built again when routes are added
+        """
+        find = self.app._router._find
+        if self._route_index is None or self._index_find is not find:
+            self._route_index = RouteIndex(self.app._router._roots)
+            self._index_find = find
+        return self._route_index
+
+    def invalidate(self):
+        """
+        drop all the cached spec data, it will be generated from scratch on
+        next access
+        """
+        self._operations = {}
+        self.registry.invalidate()
+        self._spec = None
+        self._spec_body = None
+        self._tag_index = None
+        self._tag_specs = {}
+
     def bypass(self, func):
         if self.config.MODE == 'greedy':
             return False
@@ -163,100 +475,44 @@ class Falibrary:
                 return True
             return False
 
+    def _router_changed(self):
+        # NOTE Falcon replaces ``_find`` of the router every time a route is
+        # added, so it's a cheap version mark of the routing table
+        return self.app._router._find is not self._router_find
+
     def _generate_spec(self):
         routes = {}
         tags = {}
+        operations = {}
         assert self.config.MODE in self.config._SUPPORT_MODE
-        for route in find_routes(self.app._router._roots):
-            path, parameters = parse_path(route.uri_template)
+        self._router_find = self.app._router._find
+        if self.registry.names != self._names:
+            # NOTE new models may rename the existing ones to avoid conflicts
+            self._operations = {}
+        parsed = {}
+        for route in self.route_index:
+            path, parameters = parsed[route.uri_template] = parse_path(route.uri_template)
             routes[path] = {}
-            for method, func in route.method_map.items():
-                if isinstance(func, partial):
-                    # ignore exception handlers
-                    continue
-
-                if self.bypass(func):
-                    continue
-
-                name = route.resource.__class__.__name__
-                func_tags = getattr(func, 'tags', None) or [name]
-                for tag in func_tags:
-                    if tag not in tags:
-                        tags[tag] = {
-                            'name': tag,
-                            'description': inspect.getdoc(route.resource) or '',
-                        }
-                summary, desc = get_summary_desc(func)
-                spec = {
-                    'summary': summary or f'{name} <{method}>',
-                    'operationID': f'{name}__{method.lower()}',
-                    'description': desc or '',
-                    'tags': func_tags,
-                }
-
-                if hasattr(func, 'data'):
-                    spec['requestBody'] = {
-                        'content': {
-                            'application/json': {
-                                'schema': {
-                                    '$ref': f'#/components/schemas/{func.data}'
-                                }
-                            }
-                        }
+        for route, method, func in self.route_index.responders(self.bypass):
+            path, parameters = parsed[route.uri_template]
+            key = (route.uri_template, method, func, route.resource.__class__)
+            operation = self._operations.get(key)
+            if operation is None:
+                operation = self._generate_operation(route, method, func, parameters)
+            operations[key] = operation
+
+            spec, description = operation
+            for tag in spec['tags']:
+                if tag not in tags:
+                    tags[tag] = {
+                        'name': tag,
+                        'description': description,
                     }
+            routes[path][method.lower()] = spec
 
-                params = parameters[:]
-                if hasattr(func, 'query'):
-                    params.append({
-                        'name': func.query,
-                        'in': 'query',
-                        'required': True,
-                        'schema': {
-                            '$ref': f'#/components/schemas/{func.query}',
-                        }
-                    })
-                spec['parameters'] = params
-
-                responses = {}
-                has_2xx = False
-                if hasattr(func, 'x'):
-                    for code, msg in func.x.items():
-                        if code.startswith('2'):
-                            has_2xx = True
-                        responses[code] = {
-                            'description': msg,
-                        }
-
-                if hasattr(func, 'resp'):
-                    responses['200'] = {
-                        'description': 'Successful Response',
-                        'content': {
-                            'application/json': {
-                                'schema': {
-                                    '$ref': f'#/components/schemas/{func.resp}'
-                                }
-                            }
-                        },
-                    }
-                elif not has_2xx:
-                    responses['200'] = {'description': 'Successful Response'}
-
-                if any([hasattr(func, schema)
-                        for schema in ('query', 'data', 'resp')]):
-                    responses['422'] = {
-                        'description': 'Validation Error',
-                    }
-
-                spec['responses'] = responses
-
-                routes[path][method.lower()] = spec
-
-        definitions = {}
-        for _, schema in self.models.items():
-            if 'definitions' in schema:
-                for key, value in schema['definitions'].items():
-                    definitions[key] = value
-                del schema['definitions']
+        # NOTE drop the operations of removed or replaced routes
+        self._operations = operations
+        self._names = self.registry.names
 
         data = {
             'openapi': self.config.OPENAPI_VERSION,
@@ -269,10 +525,99 @@ class Falibrary:
                 **routes
             },
             'components': {
-                'schemas': {
-                    name: schema for name, schema in self.models.items()
-                },
+                'schemas': self.registry.schemas,
             },
-            'definitions': definitions
         }
         self._spec = data
+        self._spec_body = None
+        self._tag_index = None
+        self._tag_specs = {}
+
+    def _generate_operation(self, route, method, func, parameters):
+        """
+        generate the spec of one route method
+
+        :returns: operation spec and the description for its tags
+        """
+        name = route.resource.__class__.__name__
+        func_tags = getattr(func, 'tags', None) or [name]
+        summary, desc = get_summary_desc(func)
+        spec = {
+            'summary': summary or f'{name} <{method}>',
+            'operationID': (
+                operation_id(func, route.resource.__class__) if hasattr(func, '__name__')
+                else f'{name}__{method.lower()}'),
+            'description': desc or '',
+            'tags': func_tags,
+        }
+
+        if hasattr(func, 'data'):
+            schema = {'$ref': self.registry.ref(func.data)}
+            if getattr(func, 'array', False):
+                schema = {'type': 'array', 'items': schema}
+                if hasattr(func, 'max_items'):
+                    schema['maxItems'] = func.max_items
+            spec['requestBody'] = {
+                'content': {
+                    'application/json': {
+                        'schema': schema
+                    }
+                }
+            }
+            max_body = getattr(func, 'max_body', self.config.MAX_BODY_SIZE)
+            if max_body is not None:
+                spec['requestBody']['x-max-body-size'] = max_body
+
+        params = parameters[:]
+        if hasattr(func, 'query'):
+            params.append({
+                'name': self.registry.name(func.query),
+                'in': 'query',
+                'required': True,
+                'schema': {
+                    '$ref': self.registry.ref(func.query),
+                }
+            })
+        spec['parameters'] = params
+
+        responses = {}
+        has_2xx = False
+        if hasattr(func, 'x'):
+            for code, msg in func.x.items():
+                if code.startswith('2'):
+                    has_2xx = True
+                responses[code] = {
+                    'description': msg,
+                }
+
+        if hasattr(func, 'resp'):
+            responses['200'] = {
+                'description': 'Successful Response',
+                'content': {
+                    'application/json': {
+                        'schema': {
+                            '$ref': self.registry.ref(func.resp)
+                        }
+                    }
+                },
+            }
+        elif not has_2xx:
+            responses['200'] = {'description': 'Successful Response'}
+
+        if any([hasattr(func, schema)
+                for schema in ('query', 'data', 'resp')]):
+            responses['422'] = {
+                'description': 'Validation Error',
+            }
+
+        if 'x-max-body-size' in spec.get('requestBody', {}) or hasattr(func, 'max_items'):
+            responses['413'] = {'description': 'Payload Too Large'}
+
+        if hasattr(func, 'rate_limit'):
+            limit, period = func.rate_limit
+            spec['x-ratelimit'] = {'limit': limit, 'period': period}
+            responses['429'] = {'description': 'Too Many Requests'}
+
+        spec['responses'] = responses
+
+        return spec, get_class_doc(route.resource.__class__)
@@ -0,0 +1,177 @@
+"""
+per-route limits checked before the request body is decoded
+"""
+import math
+from time import monotonic
+from threading import Lock
+from collections import OrderedDict
+
+import falcon
+
+from falibrary.stream import CHUNK_SIZE
+
+# max number of clients tracked by a rate limiter with ``key``
+MAX_KEYS = 10000
+
+
+def too_large(description):
+    return falcon.HTTPPayloadTooLarge(
+        title='Request body is too large',
+        description=description,
+    )
+
+
+class BoundedReader:
+    """
+    file-like reader that rejects the request once more than ``limit``
+    bytes are read, for bodies without ``Content-Length``
+
+    :param stream: file-like object with ``read(size)`` returning bytes
+    :param limit: max body size in bytes
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.count = 0
+
+    def consume(self, chunk):
+        self.count += len(chunk)
+        if self.count > self.limit:
+            raise too_large(f'Request body should be no more than {self.limit} bytes')
+        return chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(CHUNK_SIZE)
+                if not chunk:
+                    return b''.join(chunks)
+                chunks.append(chunk)
+        return self.consume(self.stream.read(size))
+
+
+class AsyncBoundedReader(BoundedReader):
+    """
+    :class:`BoundedReader` for ASGI request
+    """
+
+    async def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = await self.read(CHUNK_SIZE)
+                if not chunk:
+                    return b''.join(chunks)
+                chunks.append(chunk)
+        return self.consume(await self.stream.read(size))
+
+
+def limit_items(items, max_items):
+    """
+    reject the request once the JSON array has more than ``max_items``
+    """
+    for index, item in enumerate(items):
+        if index >= max_items:
+            raise too_large(f'Request body should have no more than {max_items} items')
+        yield item
+
+
+def check_items(media, max_items):
+    """
+    reject the decoded JSON array with more than ``max_items`` before it's
+    validated
+    """
+    if isinstance(media, list) and len(media) > max_items:
+        raise too_large(f'Request body should have no more than {max_items} items')
+    return media
+
+
+class TokenBucket:
+    """
+    allow ``limit`` requests in ``period`` seconds, with bursts up to
+    ``limit``
+
+    :param limit: number of requests
+    :param period: seconds
+    """
+
+    def __init__(self, limit, period):
+        self.capacity = limit
+        self.rate = limit / period
+        self.tokens = float(limit)
+        self.updated = monotonic()
+
+    def acquire(self):
+        """
+        :returns: seconds to wait for the next token, ``0`` if it's acquired
+        """
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    token bucket rate limit of one route
+
+    :param limit: number of requests
+    :param period: seconds
+    :param key: function to get the client key from request, each client
+        has its own bucket, ``None`` shares one bucket for all the clients
+    """
+
+    def __init__(self, limit, period, key=None):
+        self.limit = limit
+        self.period = period
+        self.key = key
+        self.lock = Lock()
+        self.buckets = OrderedDict()
+
+    def check(self, req):
+        """
+        :raises falcon.HTTPTooManyRequests: with ``Retry-After``
+        """
+        key = self.key(req) if self.key else None
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.limit, self.period)
+                if len(self.buckets) > MAX_KEYS:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            wait = bucket.acquire()
+
+        if wait:
+            raise falcon.HTTPTooManyRequests(
+                title='Too many requests',
+                description=f'Rate limit is {self.limit} requests per {self.period} seconds',
+                retry_after=math.ceil(wait),
+            )
+
+
+def limited_loader(load, limiter, is_async=False):
+    """
+    check the rate limit before ``load``
+
+    :param load: see :func:`falibrary.validation.request_loader`, ``None``
+        if there is nothing to validate
+    :param limiter: :class:`RateLimiter`
+    """
+    if is_async:
+        async def limited(req):
+            limiter.check(req)
+            if load:
+                await load(req)
+    else:
+        def limited(req):
+            limiter.check(req)
+            if load:
+                load(req)
+    return limited
@@ -0,0 +1,258 @@
+"""
+metrics of request validation
+
+set ``Config.COLLECTOR`` before decorating the routes, routes decorated
+without a collector are not instrumented at all
+"""
+from time import perf_counter
+from threading import Lock
+from collections import defaultdict
+
+from pydantic import ValidationError
+
+
+class Collector:
+    """
+    interface of metrics collector, subclass it and override the methods
+
+    ``operation`` is ``{class}__{method}`` of the responder, see
+    :func:`operation_id`, it's the ``operationID`` in the spec unless the
+    responder is inherited
+    """
+
+    def observe(self, operation, stage, seconds):
+        """
+        time spent on validation
+
+        :param stage: 'query', 'data' or 'resp'
+        """
+
+    def validation_error(self, operation, stage, field):
+        """
+        a field failed validation
+
+        :param field: location of the field joined by '.'
+        """
+
+    def payload_size(self, operation, kind, size):
+        """
+        size of the body in bytes
+
+        :param kind: 'request' or 'response'
+        """
+
+    def queue_depth(self, depth):
+        """
+        number of bodies waiting or being validated in the offload executor,
+        see ``Config.OFFLOAD_THRESHOLD``
+        """
+
+
+class InMemoryCollector(Collector):
+    """
+    collect metrics in process, export them with :meth:`snapshot` or in
+    Prometheus text format with :meth:`export`
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # (operation, stage) -> [count, sum, max]
+            self.timings = defaultdict(lambda: [0, 0.0, 0.0])
+            # (operation, stage, field) -> count
+            self.errors = defaultdict(int)
+            # (operation, kind) -> [count, sum, max]
+            self.sizes = defaultdict(lambda: [0, 0, 0])
+            # current, max
+            self.queue = [0, 0]
+
+    def observe(self, operation, stage, seconds):
+        with self.lock:
+            summary = self.timings[(operation, stage)]
+            summary[0] += 1
+            summary[1] += seconds
+            summary[2] = max(summary[2], seconds)
+
+    def validation_error(self, operation, stage, field):
+        with self.lock:
+            self.errors[(operation, stage, field)] += 1
+
+    def payload_size(self, operation, kind, size):
+        with self.lock:
+            summary = self.sizes[(operation, kind)]
+            summary[0] += 1
+            summary[1] += size
+            summary[2] = max(summary[2], size)
+
+    def queue_depth(self, depth):
+        with self.lock:
+            self.queue[0] = depth
+            self.queue[1] = max(self.queue[1], depth)
+
+    def snapshot(self):
+        """
+        :returns: copy of the metrics as dicts
+        """
+        with self.lock:
+            return {
+                'timings': {key: tuple(value) for key, value in self.timings.items()},
+                'errors': dict(self.errors),
+                'sizes': {key: tuple(value) for key, value in self.sizes.items()},
+                'queue': tuple(self.queue),
+            }
+
+    def export(self):
+        """
+        :returns: metrics in Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def summary(name, help_text, data, label_names):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for key, (count, total, _) in sorted(data.items()):
+                labels = format_labels(label_names, key)
+                lines.append(f'{name}_count{{{labels}}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {total}')
+
+        summary(
+            'falibrary_validation_seconds',
+            'Time spent on validation.',
+            snapshot['timings'],
+            ('operation', 'stage'),
+        )
+        lines.append('# HELP falibrary_validation_errors_total Fields failed validation.')
+        lines.append('# TYPE falibrary_validation_errors_total counter')
+        for key, count in sorted(snapshot['errors'].items()):
+            labels = format_labels(('operation', 'stage', 'field'), key)
+            lines.append(f'falibrary_validation_errors_total{{{labels}}} {count}')
+        summary(
+            'falibrary_payload_bytes',
+            'Size of validated bodies.',
+            snapshot['sizes'],
+            ('operation', 'kind'),
+        )
+        depth, max_depth = snapshot['queue']
+        lines.append('# HELP falibrary_offload_queue_depth Bodies in the offload executor.')
+        lines.append('# TYPE falibrary_offload_queue_depth gauge')
+        lines.append(f'falibrary_offload_queue_depth {depth}')
+        lines.append('# HELP falibrary_offload_queue_depth_max Max bodies in the offload executor.')
+        lines.append('# TYPE falibrary_offload_queue_depth_max gauge')
+        lines.append(f'falibrary_offload_queue_depth_max {max_depth}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(names, values):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+
+
+def error_fields(err):
+    """
+    locations of the fields in ``pydantic.ValidationError``, row indexes of
+    ``batch`` and ``stream`` bodies are dropped to keep the labels bounded
+    """
+    return [
+        '.'.join(str(loc) for loc in error['loc'] if not isinstance(loc, int))
+        for error in err.errors()
+    ]
+
+
+def operation_id(func, resource=None):
+    """
+    get ``{class}__{method}`` of the responder
+
+    ``method`` keeps the suffix of the responder (``on_get_item`` ->
+    ``get_item``). The spec passes the class of the mounted ``resource``,
+    so ids are unique per route. Metrics, cache and response checks are set
+    up when the responder is decorated, they use the class that defines it,
+    so resources that inherit one responder share its id there.
+    """
+    if resource is not None:
+        cls = resource.__name__
+    else:
+        names = func.__qualname__.split('.')
+        cls = names[-2] if len(names) > 1 else func.__module__
+    method = func.__name__
+    if method.startswith('on_'):
+        method = method[3:]
+    return f'{cls}__{method}'
+
+
+def instrument(collector, operation, query, parse, dump, is_async=False):
+    """
+    wrap the validation steps to report metrics to ``collector``
+
+    it's only called for routes decorated with a collector, so routes
+    without one keep the plain steps
+
+    :param query: see :class:`falibrary.query.QueryDecoder`
+    :param parse: see :func:`falibrary.validation.body_parser`, the time of
+        stream routes only covers the setup as items are validated lazily
+    :param dump: see :func:`falibrary.validation.response_dumper`, the size
+        of streamed responses is not recorded
+    :returns: the wrapped ``query``, ``parse`` and ``dump``
+    """
+    def failed(stage, err):
+        for field in error_fields(err):
+            collector.validation_error(operation, stage, field)
+
+    if query:
+        decode = query
+
+        def query(req):
+            start = perf_counter()
+            try:
+                return decode(req)
+            except ValidationError as err:
+                failed('query', err)
+                raise
+            finally:
+                collector.observe(operation, 'query', perf_counter() - start)
+
+    if parse and is_async:
+        async_parse = parse
+
+        async def parse(req):
+            if req.content_length is not None:
+                collector.payload_size(operation, 'request', req.content_length)
+            start = perf_counter()
+            try:
+                return await async_parse(req)
+            except ValidationError as err:
+                failed('data', err)
+                raise
+            finally:
+                collector.observe(operation, 'data', perf_counter() - start)
+    elif parse:
+        sync_parse = parse
+
+        def parse(req):
+            if req.content_length is not None:
+                collector.payload_size(operation, 'request', req.content_length)
+            start = perf_counter()
+            try:
+                return sync_parse(req)
+            except ValidationError as err:
+                failed('data', err)
+                raise
+            finally:
+                collector.observe(operation, 'data', perf_counter() - start)
+
+    if dump:
+        plain_dump = dump
+
+        def dump(req, resp, response):
+            start = perf_counter()
+            plain_dump(req, resp, response)
+            collector.observe(operation, 'resp', perf_counter() - start)
+            if resp.data is not None:
+                collector.payload_size(operation, 'response', len(resp.data))
+
+    return query, parse, dump
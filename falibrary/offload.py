@@ -0,0 +1,144 @@
+"""
+offload decoding and validation of large request bodies to an executor
+"""
+from threading import Lock
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+import falcon
+from pydantic import ValidationError
+
+from falibrary.serializer import get_serializer
+
+
+def decode_and_validate(model, body, serializer):
+    """
+    decode the JSON body and validate it with the model, it's a module
+    level function so it can be sent to process pool
+
+    :param model: ``pydantic.BaseModel`` defined at module level
+    :param body: raw bytes of the body
+    :param serializer: name of the serializer, see ``Config.SERIALIZER``
+    :raises ValueError: if the body is not valid JSON
+    """
+    try:
+        media = get_serializer(serializer).loads(body) if body else {}
+    except ValidationError:
+        raise
+    except ValueError as err:
+        # NOTE the exceptions of JSON libraries may not be picklable
+        raise ValueError(str(err))
+    return model(**media)
+
+
+class Offloader:
+    """
+    run :func:`decode_and_validate` in the executor of ``Config.OFFLOAD_EXECUTOR``
+
+    requests are rejected with ``503`` if there are already
+    ``Config.OFFLOAD_MAX_PENDING`` bodies waiting or in progress, the
+    number is reported to ``Config.COLLECTOR`` as queue depth
+
+    :param api: :class:`falibrary.Falibrary`
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.lock = Lock()
+        self.pending = 0
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            executor = self.api.config.OFFLOAD_EXECUTOR
+            if isinstance(executor, Executor):
+                self._executor = executor
+            else:
+                assert executor in ('process', 'thread'), \
+                    f'unknown offload executor {executor}'
+                if executor == 'process':
+                    # NOTE ``multiprocessing`` is only imported when it's used
+                    from concurrent.futures import ProcessPoolExecutor as pool
+                else:
+                    pool = ThreadPoolExecutor
+                self._executor = pool(self.api.config.OFFLOAD_WORKERS)
+        return self._executor
+
+    def shutdown(self, wait=True):
+        """
+        shut down the executor created by this offloader
+        """
+        if self._executor is not None and not isinstance(
+                self.api.config.OFFLOAD_EXECUTOR, Executor):
+            self._executor.shutdown(wait=wait)
+        self._executor = None
+
+    def acquire(self):
+        config = self.api.config
+        with self.lock:
+            if self.pending >= config.OFFLOAD_MAX_PENDING:
+                raise falcon.HTTPServiceUnavailable(
+                    title='Server is busy',
+                    description='Too many large requests are being validated',
+                    retry_after=1,
+                )
+            self.pending += 1
+            depth = self.pending
+        if config.COLLECTOR is not None:
+            config.COLLECTOR.queue_depth(depth)
+
+    def release(self):
+        with self.lock:
+            self.pending -= 1
+            depth = self.pending
+        if self.api.config.COLLECTOR is not None:
+            self.api.config.COLLECTOR.queue_depth(depth)
+
+    def submit(self, model, body):
+        # NOTE custom serializers are sent as is, they should be picklable
+        serializer = self.api.serializer
+        return self.executor.submit(
+            decode_and_validate, model, body, getattr(serializer, 'name', serializer))
+
+    def run(self, model, body):
+        """
+        :returns: the model instance
+        :raises pydantic.ValidationError:
+        """
+        self.acquire()
+        try:
+            future = self.submit(model, body)
+            try:
+                return future.result()
+            except ValidationError:
+                raise
+            except ValueError as err:
+                raise bad_json(err)
+        finally:
+            self.release()
+
+    async def run_async(self, model, body):
+        """
+        coroutine version of :meth:`run`
+        """
+        # NOTE WSGI workers don't import ``asyncio`` with ``falibrary``
+        import asyncio
+
+        self.acquire()
+        try:
+            future = asyncio.wrap_future(self.submit(model, body))
+            try:
+                return await future
+            except ValidationError:
+                raise
+            except ValueError as err:
+                raise bad_json(err)
+        finally:
+            self.release()
+
+
+def bad_json(err):
+    return falcon.HTTPBadRequest(
+        title='Invalid JSON',
+        description=f'Could not parse JSON body - {err}',
+    )
@@ -0,0 +1,201 @@
+"""
+decode the query string into ``query`` models
+"""
+from urllib.parse import unquote_plus
+
+from pydantic import ValidationError, errors, Extra
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import (
+    SHAPE_LIST, SHAPE_SET, SHAPE_FROZENSET, SHAPE_SEQUENCE, SHAPE_TUPLE_ELLIPSIS)
+
+from falibrary.batch import Column, build_model
+
+# field shapes built from repeated keys
+ARRAY_SHAPES = {
+    SHAPE_LIST, SHAPE_SET, SHAPE_FROZENSET, SHAPE_SEQUENCE, SHAPE_TUPLE_ELLIPSIS}
+# NOTE same as ``pydantic.validators.bool_validator``
+BOOL_TRUE = {'1', 'on', 't', 'true', 'y', 'yes'}
+BOOL_FALSE = {'0', 'off', 'f', 'false', 'n', 'no'}
+# returned by converters if the value should go through pydantic
+FALLBACK = object()
+
+
+def compile_converter(column):
+    """
+    build the function that converts the raw string of a field and checks
+    the constraints compiled in :class:`falibrary.batch.Column`
+
+    :returns: function of raw value -> (value, error), ``None`` if the field
+        is not supported
+    """
+    accept = column.accept
+    if not accept:
+        return None
+    kind = accept[0]
+    bounds, min_length, max_length = column.bounds, column.min_length, column.max_length
+
+    def convert(value):
+        if kind is bool:
+            lower = value.lower()
+            if lower in BOOL_TRUE:
+                return True, None
+            if lower in BOOL_FALSE:
+                return False, None
+            return FALLBACK, None
+
+        if kind is not str:
+            try:
+                value = kind(value)
+            except ValueError:
+                return FALLBACK, None
+        for limit, error_cls, compare in bounds:
+            if not compare(value, limit):
+                return None, error_cls(limit_value=limit)
+        if min_length is not None and len(value) < min_length:
+            return None, errors.AnyStrMinLengthError(limit_value=min_length)
+        if max_length is not None and len(value) > max_length:
+            return None, errors.AnyStrMaxLengthError(limit_value=max_length)
+        return value, None
+    return convert
+
+
+def compile_list_converter(model, field):
+    """
+    build the converter of ``List[...]`` fields from the converter of items
+
+    :returns: ``None`` if the field is not supported
+    """
+    # NOTE constrained lists (``conlist``) are classes with their own checks
+    if field.shape != SHAPE_LIST or isinstance(field.outer_type_, type):
+        return None
+    if field.class_validators or field.allow_none or not field.sub_fields:
+        return None
+    convert_item = compile_converter(Column(model, field.sub_fields[0]))
+    if convert_item is None:
+        return None
+
+    def convert(values):
+        result = []
+        for value in values:
+            value, error = convert_item(value)
+            if error is not None or value is FALLBACK:
+                return FALLBACK, None
+            result.append(value)
+        return result, None
+    return convert
+
+
+class QueryDecoder:
+    """
+    compiled decoder of the query string for one ``query`` model
+
+    * repeated keys are collected for list (set, tuple, ...) fields, the
+      other fields take the last value
+    * unknown keys are dropped, unless the model keeps extra fields
+    * ``str``, ``int``, ``float``, ``bool`` fields and lists of them are
+      converted and checked here, the others (and invalid values) go through
+      ``ModelField.validate`` so the result is the same as pydantic
+
+    :param model: ``pydantic.BaseModel`` of query args
+    """
+
+    def __init__(self, model):
+        self.model = model
+        config = model.__config__
+        self.keep_extra = config.extra != Extra.ignore
+        # NOTE root validators need the whole input, ``always`` validators and
+        # ``validate_all`` also run on the missing fields
+        self.construct = not any((
+            model.__pre_root_validators__,
+            model.__post_root_validators__,
+            self.keep_extra,
+            config.validate_all,
+            any(field.validate_always for field in model.__fields__.values()),
+        ))
+        self.private = bool(model.__private_attributes__)
+        self.columns = [Column(model, field) for field in model.__fields__.values()]
+        self.converters = [
+            compile_list_converter(model, column.field)
+            if column.field.shape in ARRAY_SHAPES else compile_converter(column)
+            for column in self.columns
+        ]
+        self.arrays = set()
+        self.keys = {}
+        for column in self.columns:
+            if column.field.shape in ARRAY_SHAPES:
+                self.arrays.add(column.alias)
+            self.keys[column.alias] = column.alias
+            if config.allow_population_by_field_name:
+                self.keys.setdefault(column.name, column.alias)
+                if column.alias in self.arrays:
+                    self.arrays.add(column.name)
+
+    def decode(self, query_string, keep_blank=False):
+        """
+        :returns: dict of alias -> raw value(s)
+        """
+        params = {}
+        keys, arrays, keep_extra = self.keys, self.arrays, self.keep_extra
+        # NOTE same as ``urllib.parse.parse_qsl``, but skip the unquoting
+        # if nothing is quoted
+        quoted = '%' in query_string or '+' in query_string
+        for pair in query_string.split('&'):
+            key, _, value = pair.partition('=')
+            if quoted:
+                key, value = unquote_plus(key), unquote_plus(value)
+            if not key or not (value or keep_blank):
+                continue
+            alias = keys.get(key)
+            if alias is None:
+                if not keep_extra:
+                    continue
+                alias = key
+            if key in arrays:
+                params.setdefault(alias, []).append(value)
+            else:
+                params[alias] = value
+        return params
+
+    def __call__(self, req):
+        """
+        decode and validate the query string of the request
+
+        :raises pydantic.ValidationError:
+        """
+        params = self.decode(
+            req.query_string, req.options.keep_blank_qs_values)
+        if not self.construct:
+            return self.model(**params)
+
+        model = self.model
+        values, errs = {}, []
+        for column, convert in zip(self.columns, self.converters):
+            alias = column.alias
+            value = params.get(alias, params)
+            if value is params:
+                if column.required:
+                    errs.append(ErrorWrapper(errors.MissingError(), loc=alias))
+                else:
+                    values[column.name] = column.field.get_default()
+                continue
+
+            if convert is not None:
+                converted, error = convert(value)
+                if error is not None:
+                    errs.append(ErrorWrapper(error, loc=alias))
+                    continue
+                if converted is not FALLBACK:
+                    values[column.name] = converted
+                    continue
+
+            value, error = column.field.validate(value, values, loc=alias, cls=model)
+            if error:
+                errs.append(error)
+            else:
+                values[column.name] = value
+
+        if errs:
+            raise ValidationError(errs, model)
+
+        return build_model(model, values, {
+            column.name for column in self.columns if column.alias in params}, self.private)
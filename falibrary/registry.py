@@ -0,0 +1,140 @@
+"""
+registry of ``pydantic.BaseModel`` schemas for OpenAPI components
+"""
+import re
+from enum import Enum
+
+from pydantic.schema import (
+    model_process_schema, get_flat_models_from_model, get_model_name_map,
+    get_long_model_name)
+
+REF_TEMPLATE = '#/components/schemas/{model}'
+# NOTE names in ``components/schemas`` should match ``^[a-zA-Z0-9._-]+$``
+INVALID_NAME = re.compile(r'[^a-zA-Z0-9._-]')
+
+
+def model_key(model):
+    """
+    fully qualified name of the model
+    """
+    return f'{model.__module__}.{model.__qualname__}'
+
+
+def model_signature(model):
+    """
+    definition of the model and its nested models in text, it changes with
+    the fields (types, defaults, constraints) and docs without generating
+    the schema
+    """
+    lines = []
+    for flat in sorted(get_flat_models_from_model(model), key=model_key):
+        # NOTE enums of the fields are in the flat models too
+        if issubclass(flat, Enum):
+            lines.append(f'{model_key(flat)} {[member.value for member in flat]!r}')
+            continue
+        lines.append(f'{model_key(flat)} {flat.__doc__!r} {flat.__config__.title!r}')
+        for field in flat.__fields__.values():
+            lines.append(' '.join((
+                field.name, field.alias, repr(field.outer_type_),
+                repr(field.required), repr(field.field_info),
+            )))
+    return '\n'.join(lines)
+
+
+class SchemaRegistry:
+    """
+    schemas are generated lazily in a single pass for all the models, each
+    model (including the nested ones) is generated only once and referred by
+    ``$ref`` to ``components/schemas``
+
+    models are keyed by the class, models with the same class name get the
+    long names from pydantic, different classes with the same long name
+    (e.g. from a factory function) get a numeric suffix
+    """
+
+    def __init__(self):
+        self.models = {}
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        drop the generated schemas
+        """
+        self._schemas = None
+        self._names = None
+
+    def add(self, model):
+        """
+        register a model, this doesn't generate the schema
+        """
+        if model not in self.models:
+            self.models[model] = model_key(model)
+            self.invalidate()
+
+    @property
+    def names(self):
+        """
+        model -> name in ``components/schemas``, a new dict is created when
+        the names may have changed
+        """
+        if self._names is None:
+            # NOTE share the known models between the registered models so
+            # the model graph is walked only once
+            known_models, listed, flat_models = set(), set(), []
+            for model in self.models:
+                if model not in known_models:
+                    found = get_flat_models_from_model(model, known_models or None)
+                    flat_models.extend(sorted(found - listed, key=model_key))
+                    listed |= found
+                    known_models |= found
+            # NOTE pydantic keeps only one of the models with the same long
+            # name (e.g. from a factory function), they are numbered in the
+            # order of registration
+            names = get_model_name_map(flat_models)
+            collided = {
+                get_long_model_name(model) for model in flat_models if model not in names}
+            counts = {}
+            for model in flat_models:
+                long_name = get_long_model_name(model)
+                if long_name in collided:
+                    name = INVALID_NAME.sub('_', long_name)
+                    counts[name] = counts.get(name, 0) + 1
+                    names[model] = name if counts[name] == 1 else f'{name}__{counts[name]}'
+            self._names = names
+        return self._names
+
+    def name(self, model):
+        """
+        name of the model in ``components/schemas``
+        """
+        self.add(model)
+        return self.names[model]
+
+    def ref(self, model):
+        """
+        ``$ref`` to the model schema
+        """
+        return REF_TEMPLATE.format(model=self.name(model))
+
+    @property
+    def schemas(self):
+        """
+        schemas of all the models and their nested models, name -> schema
+        """
+        if self._schemas is None:
+            names = self.names
+            # NOTE with all the models known, nested models are referred by
+            # ``$ref`` instead of being generated again for each parent
+            known_models = set(names)
+            schemas = {}
+            for model, name in names.items():
+                schema, definitions, _ = model_process_schema(
+                    model,
+                    model_name_map=names,
+                    ref_template=REF_TEMPLATE,
+                    known_models=known_models,
+                )
+                schemas.update(definitions)
+                schemas[name] = schema
+            self._schemas = schemas
+        return self._schemas
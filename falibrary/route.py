@@ -2,34 +2,206 @@
 route for API document page and OpenAPI spec
 """
 import os
-import re
-import pkg_resources
+import gzip
+import json
+import hashlib
+import falcon
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# NOTE the package is installed with ``zip_safe=False``, so the bundled
+# templates always live next to this file
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class MappedReader:
+    """
+    file-like reader of a shared buffer (e.g. ``mmap``), each response
+    gets its own position so the buffer is never copied as a whole
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.pos = 0
+
+    def read(self, size=-1):
+        end = len(self.buffer) if size is None or size < 0 else self.pos + size
+        chunk = self.buffer[self.pos:end]
+        self.pos += len(chunk)
+        return chunk
+
+
+class AsyncMappedReader(MappedReader):
+    """
+    :class:`MappedReader` for ASGI response
+    """
+
+    async def read(self, size=-1):
+        return MappedReader.read(self, size)
+
+
+class StaticBody:
+    """
+    immutable response body with precompressed variants and ETag
+
+    :param content: raw bytes of the body, or a memory-mapped file which
+        is streamed without loading it into the process
+    :param content_type: MIME type of the body
+    :param variants: precompressed bodies, encoding -> bytes or memory-mapped
+        file, the missing ones are compressed here
+    """
+
+    def __init__(self, content, content_type, variants=None):
+        self.content_type = content_type
+        self.etag = hashlib.sha1(content).hexdigest()
+        self.variants = {'identity': content}
+        self.variants.update(variants or {})
+        if 'gzip' not in self.variants:
+            self.variants['gzip'] = gzip.compress(content, compresslevel=9)
+        if 'br' not in self.variants and brotli is not None:
+            self.variants['br'] = brotli.compress(content)
+
+    def select(self, accept_encoding):
+        """
+        choose the smallest acceptable encoding
+
+        :param accept_encoding: value of the ``Accept-Encoding`` header
+        """
+        if not accept_encoding:
+            return 'identity'
+
+        accepted = set()
+        for item in accept_encoding.split(','):
+            coding, _, params = item.partition(';')
+            name, _, value = params.partition('=')
+            if name.strip() == 'q':
+                try:
+                    if float(value) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(coding.strip().lower())
+
+        for coding in ('br', 'gzip'):
+            if coding in self.variants and (coding in accepted or '*' in accepted):
+                return coding
+        return 'identity'
+
+    def send(self, req, resp, cache_control, is_async=False):
+        """
+        write this body to the response, or ``304`` if the client has it
+
+        :param is_async: the response is ASGI response
+        """
+        resp.etag = self.etag
+        resp.vary = ('Accept-Encoding',)
+        if cache_control:
+            resp.set_header('Cache-Control', cache_control)
+
+        for etag in (req.if_none_match or ()):
+            if etag == '*' or etag == self.etag:
+                resp.status = falcon.HTTP_304
+                return
+
+        coding = self.select(req.get_header('Accept-Encoding'))
+        if coding != 'identity':
+            resp.set_header('Content-Encoding', coding)
+        resp.content_type = self.content_type
+        content = self.variants[coding]
+        if isinstance(content, bytes):
+            resp.data = content
+        else:
+            reader = AsyncMappedReader if is_async else MappedReader
+            resp.set_stream(reader(content), len(content))
+
+
+def dump_spec(spec):
+    """
+    serialize the spec to compact UTF-8 JSON bytes
+    """
+    return json.dumps(spec, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 
 class DocPage:
     def __init__(self, config):
         self.config = config
-        assert config.UI in config._SUPPORT_UI, f'{config.UI} is not supported'
-        self.ui_file = f'{config.UI}.html'
+        self.invalidate()
 
-    def on_get(self, req, resp):
-        resp.content_type = 'text/html'
-        with open(os.path.join(
-                  pkg_resources.resource_filename(
-                      'falibrary',
-                      self.config.TEMPLATE_FOLDER),
-                  self.ui_file), 'r', encoding='utf-8') as f:
-            page = f.read()
+    def invalidate(self):
+        """
+        drop the rendered page, it will be rendered again on next request
+        """
+        assert self.config.UI in self.config._SUPPORT_UI, \
+            f'{self.config.UI} is not supported'
+        self._body = None
+
+    @property
+    def body(self):
+        """
+        rendered page with precompressed variants and ETag
+        """
+        if self._body is None:
+            # NOTE the page of split specs loads the tag index first
+            name, url = self.config.UI, self.config.SPEC_URL
+            if self.config.SPLIT_SPEC:
+                name, url = f'{name}_tags', self.config.TAGS_URL
+            with open(os.path.join(
+                      PACKAGE_DIR,
+                      self.config.TEMPLATE_FOLDER,
+                      f'{name}.html'), 'r', encoding='utf-8') as f:
+                page = f.read()
 
-        resp.body = re.sub('{{}}', self.config.SPEC_URL, page)
+            page = page.replace('{{}}', url)
+            self._body = StaticBody(page.encode('utf-8'), 'text/html; charset=utf-8')
+        return self._body
+
+    def on_get(self, req, resp):
+        self.body.send(req, resp, self.config.CACHE_CONTROL)
 
 
 class OpenAPI:
+    """
+    OpenAPI spec, the index of tags (suffix ``tags``) and the spec of each
+    tag (suffix ``tag``) if ``Config.SPLIT_SPEC`` is enabled
+    """
+
     def __init__(self, api):
         self.api = api
 
     def on_get(self, req, resp):
-        resp.media = self.api.spec
+        self.api.spec_body.send(req, resp, self.api.config.CACHE_CONTROL)
+
+    def on_get_tags(self, req, resp):
+        self.api.tag_index_body.send(req, resp, self.api.config.CACHE_CONTROL)
+
+    def on_get_tag(self, req, resp, tag):
+        self.api.tag_spec_body(tag).send(req, resp, self.api.config.CACHE_CONTROL)
+
+
+class AsyncDocPage(DocPage):
+    """
+    :class:`DocPage` for ASGI application
+    """
+
+    async def on_get(self, req, resp):
+        self.body.send(req, resp, self.config.CACHE_CONTROL, is_async=True)
+
+
+class AsyncOpenAPI(OpenAPI):
+    """
+    :class:`OpenAPI` for ASGI application
+    """
+
+    async def on_get(self, req, resp):
+        self.api.spec_body.send(req, resp, self.api.config.CACHE_CONTROL, is_async=True)
 
+    async def on_get_tags(self, req, resp):
+        self.api.tag_index_body.send(
+            req, resp, self.api.config.CACHE_CONTROL, is_async=True)
 
-_doc_class_name = [x.__name__ for x in (DocPage, OpenAPI)]
+    async def on_get_tag(self, req, resp, tag):
+        self.api.tag_spec_body(tag).send(
+            req, resp, self.api.config.CACHE_CONTROL, is_async=True)
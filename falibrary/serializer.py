@@ -0,0 +1,122 @@
+"""
+JSON serializers used by validated routes
+
+a serializer provides ``loads(bytes)``, ``dumps(obj) -> bytes`` and
+``dump_model(model) -> bytes``
+"""
+import json
+
+from pydantic.json import pydantic_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def model_json(model):
+    """
+    serialize the model with ``model.json()``, which applies
+    ``Config.json_encoders``
+    """
+    return model.json(ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class JSONSerializer:
+    """
+    serializer with the Python standard library
+    """
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj,
+            ensure_ascii=False,
+            separators=(',', ':'),
+            default=pydantic_encoder,
+        ).encode('utf-8')
+
+    def dump_model(self, model):
+        return model_json(model)
+
+
+class OrjsonSerializer:
+    """
+    serializer with `orjson <https://github.com/ijl/orjson>`_
+    """
+    name = 'orjson'
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    def dump_model(self, model):
+        # NOTE orjson falls back to ``pydantic_encoder`` for the model, values
+        # like ``datetime`` and ``UUID`` are encoded natively by orjson,
+        # non-str keys (e.g. ``Dict[int, str]``) are converted like ``json``,
+        # custom encoders may override the native ones, so they go through
+        # pydantic
+        if model.__config__.json_encoders:
+            return model_json(model)
+        return orjson.dumps(
+            model, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+
+class UjsonSerializer:
+    """
+    serializer with `ujson <https://github.com/ultrajson/ultrajson>`_
+    """
+    name = 'ujson'
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        return ujson.dumps(
+            obj,
+            ensure_ascii=False,
+            default=pydantic_encoder,
+        ).encode('utf-8')
+
+    def dump_model(self, model):
+        if model.__config__.json_encoders:
+            return model_json(model)
+        return self.dumps(model)
+
+
+SERIALIZERS = {
+    'orjson': (OrjsonSerializer, orjson),
+    'ujson': (UjsonSerializer, ujson),
+    'json': (JSONSerializer, json),
+}
+
+
+def get_serializer(name):
+    """
+    get the serializer by name
+
+    :param name: 'auto', 'orjson', 'ujson', 'json' or a serializer instance.
+        'auto' chooses the fastest one installed.
+    """
+    if not isinstance(name, str):
+        return name
+
+    if name == 'auto':
+        for cls, backend in SERIALIZERS.values():
+            if backend is not None:
+                return cls()
+
+    assert name in SERIALIZERS, f'{name} is not supported'
+    cls, backend = SERIALIZERS[name]
+    assert backend is not None, f'{name} is not installed'
+    return cls()
@@ -0,0 +1,187 @@
+"""
+incremental parsing of JSON array request bodies
+"""
+import json
+import codecs
+
+import falcon
+from pydantic import ValidationError
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+DELIMITERS = frozenset(',]' + WHITESPACE)
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """
+    parse a top-level JSON array from a file-like object and yield items
+    one by one, only a chunk of the body is kept in memory
+
+    :param stream: file-like object with ``read(size)`` returning bytes
+    :param chunk_size: bytes to read each time
+    :raises ValueError: if the body is not a valid JSON array
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + utf8.decode(chunk or b'', final=eof)
+        pos = 0
+
+    def skip():
+        # skip whitespace, read more data if the buffer is exhausted
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip()
+    if buffer[pos:pos + 1] != '[':
+        raise ValueError('Expecting a JSON array')
+    pos += 1
+
+    skip()
+    if buffer[pos:pos + 1] == ']':
+        return
+
+    while True:
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # NOTE a value not followed by a delimiter may be cut in half,
+            # e.g. the number ``3.5`` decoded as ``3`` from the buffer ``3.``
+            if not eof and buffer[end:end + 1] not in DELIMITERS:
+                fill()
+                continue
+            break
+
+        pos = end
+        yield item
+
+        skip()
+        char = buffer[pos:pos + 1]
+        pos += 1
+        if char == ']':
+            break
+        if char != ',':
+            raise ValueError(f'Expecting "," or "]" after item, got {char!r}')
+        skip()
+
+    skip()
+    if pos < len(buffer):
+        raise ValueError('Extra data after the JSON array')
+
+
+def iter_models(model, items):
+    """
+    validate items with the model lazily
+
+    :raises falcon.HTTPUnprocessableEntity: if an item failed validation
+    :raises falcon.HTTPBadRequest: if the body is not a valid JSON array
+    """
+    index = 0
+    try:
+        for index, item in enumerate(items):
+            yield model.parse_obj(item)
+    except ValidationError as err:
+        raise falcon.HTTPUnprocessableEntity(
+            title='Schema failed validation',
+            description=f'item {index}: {err}',
+        )
+    except ValueError as err:
+        raise falcon.HTTPBadRequest(
+            title='Invalid JSON',
+            description=f'Could not parse JSON array - {err}',
+        )
+
+
+class JSONArrayEncoder:
+    """
+    validate and encode items one by one as a JSON array or NDJSON, items
+    are buffered up to ``chunk_size`` bytes for each write
+
+    :param model: items that are not instances of it are validated with it
+    :param encode: function to encode a model instance to bytes
+    :param ndjson: newline delimited JSON instead of JSON array
+    """
+
+    def __init__(self, model, encode, ndjson=False, chunk_size=CHUNK_SIZE):
+        self.model = model
+        self.encode = encode
+        self.ndjson = ndjson
+        self.chunk_size = chunk_size
+        if ndjson:
+            start, self.separator, self.stop = b'', b'\n', b'\n'
+        else:
+            start, self.separator, self.stop = b'[', b',', b']'
+        self.chunk, self.size, self.first = [start], len(start), True
+
+    def feed(self, item):
+        """
+        :returns: a chunk of bytes if the buffer is full, otherwise ``None``
+        """
+        if not isinstance(item, self.model):
+            item = self.model.parse_obj(item)
+        data = self.encode(item)
+        if self.first:
+            self.first = False
+        else:
+            self.chunk.append(self.separator)
+            self.size += len(self.separator)
+        self.chunk.append(data)
+        self.size += len(data)
+        if self.size >= self.chunk_size:
+            chunk, self.chunk, self.size = self.chunk, [], 0
+            return b''.join(chunk)
+        return None
+
+    def close(self):
+        """
+        :returns: the last chunk of bytes
+        """
+        if not (self.ndjson and self.first):
+            self.chunk.append(self.stop)
+        return b''.join(self.chunk)
+
+
+def iter_json_bytes(model, items, encode, ndjson=False):
+    """
+    encode an iterable of models, see :class:`JSONArrayEncoder`
+    """
+    encoder = JSONArrayEncoder(model, encode, ndjson)
+    for item in items:
+        chunk = encoder.feed(item)
+        if chunk:
+            yield chunk
+    yield encoder.close()
+
+
+async def aiter_json_bytes(model, items, encode, ndjson=False):
+    """
+    encode an iterable or async iterable of models as an async iterable,
+    see :class:`JSONArrayEncoder`
+    """
+    encoder = JSONArrayEncoder(model, encode, ndjson)
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            chunk = encoder.feed(item)
+            if chunk:
+                yield chunk
+    else:
+        for item in items:
+            chunk = encoder.feed(item)
+            if chunk:
+                yield chunk
+    yield encoder.close()
@@ -2,10 +2,12 @@
 utils functions
 """
 import re
+from functools import lru_cache, partial
 from inspect import getdoc
+from collections import namedtuple
 from falcon.routing.compiled import _FIELD_PATTERN
 
-from falibrary.route import _doc_class_name
+from falibrary.route import DocPage, OpenAPI
 
 # NOTE from `falcon.routing.compiled.CompiledRouterNode`
 ESCAPE = r'[\.\(\)\[\]\?\$\*\+\^\|]'
@@ -18,35 +20,227 @@ INT_ARGS = re.compile(r'''
     (?P<value>\d+)\s*
 ''', re.VERBOSE)
 INT_ARGS_NAMES = ('num_digits', 'min', 'max')
+# NOTE caches are shared by all the ``Falibrary`` instances in the process
+CACHE_SIZE = 4096
 
 
-def find_routes(root):
-    routes = []
+# NOTE async doc resources are subclasses of these
+DOC_RESOURCES = (DocPage, OpenAPI)
+# module of the default responders, Falcon 2 wraps them in ``partial``
+DEFAULT_RESPONDERS = 'falcon.responders'
 
-    def find_node(node):
-        if node.resource and node.resource.__class__.__name__ not in _doc_class_name:
-            routes.append(node)
+Route = namedtuple('Route', ['uri_template', 'resource', 'method_map'])
 
-        for child in node.children:
-            find_node(child)
 
-    for route in root:
-        find_node(route)
+def iter_nodes(roots):
+    """
+    iterate all the nodes of ``CompiledRouter`` in depth-first order, without
+    recursion
+    """
+    stack = [iter(roots)]
+    while stack:
+        for node in stack[-1]:
+            yield node
+            if node.children:
+                stack.append(iter(node.children))
+                break
+        else:
+            stack.pop()
 
-    return routes
+
+def find_routes(roots):
+    """
+    iterate the nodes with resources in depth-first order, the API document
+    resources are skipped
+    """
+    for node in iter_nodes(roots):
+        resource = node.resource
+        if resource is not None and not isinstance(resource, DOC_RESOURCES):
+            yield node
+
+
+def is_default_responder(func):
+    """
+    check if the responder is added by Falcon, like ``OPTIONS`` and
+    ``405 Method Not Allowed``
+    """
+    return isinstance(func, partial) or getattr(func, '__module__', None) == DEFAULT_RESPONDERS
+
+
+class RouteIndex:
+    """
+    index of the routes: URI template -> :class:`Route`, which keeps only
+    the responders defined by the resource, see :func:`is_default_responder`
+
+    :param roots: roots of ``CompiledRouter``
+    """
+
+    def __init__(self, roots):
+        self.routes = {}
+        for node in find_routes(roots):
+            self.routes[node.uri_template] = Route(
+                node.uri_template,
+                node.resource,
+                {method: func for method, func in node.method_map.items()
+                 if not is_default_responder(func)},
+            )
+
+    def __iter__(self):
+        return iter(self.routes.values())
+
+    def __len__(self):
+        return len(self.routes)
+
+    def get(self, uri_template):
+        """
+        :returns: :class:`Route` or ``None``
+        """
+        return self.routes.get(uri_template)
+
+    def responders(self, bypass=None):
+        """
+        iterate ``(route, method, responder)``
+
+        :param bypass: function to skip responders
+        """
+        for route in self.routes.values():
+            for method, func in route.method_map.items():
+                if bypass is None or not bypass(func):
+                    yield route, method, func
+
+
+def is_asgi(app):
+    """
+    check if the app is ``falcon.asgi.App`` (Falcon 3+)
+    """
+    try:
+        from falcon.asgi import App
+    except ImportError:
+        return False
+    return isinstance(app, App)
 
 
 def get_summary_desc(func):
+    """
+    get summary and description from the docstring of responder
+
+    the result is cached by the underlying function, so bound methods of
+    different resource instances share the same entry
+    """
+    return _summary_desc(getattr(func, '__func__', func))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _summary_desc(func):
     doc = getdoc(func)
     if doc is None:
         return None, None
     doc = doc.split('\n\n', 1)
     if len(doc) == 1:
         return doc[0], None
-    return doc
+    return tuple(doc)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_class_doc(cls):
+    """
+    get the docstring of the resource class (cached)
+    """
+    return getdoc(cls) or ''
 
 
 def parse_path(path):
+    """
+    convert Falcon URI template to OpenAPI path and path parameters
+
+    the result is cached by URI template, the parameter dicts are shared
+    and should be treated as read-only
+
+    :returns: path, list of parameters
+    """
+    path, parameters = _parse_path(path)
+    return path, list(parameters)
+
+
+def collect_refs(obj, schemas, prefix='#/components/schemas/'):
+    """
+    names of the schemas referred by ``obj``, directly or through other
+    schemas
+
+    :param schemas: name -> schema
+    """
+    names = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str) and ref.startswith(prefix):
+                name = ref[len(prefix):]
+                if name not in names and name in schemas:
+                    names.add(name)
+                    stack.append(schemas[name])
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return names
+
+
+def split_spec(spec, tag):
+    """
+    slice the spec to the operations of one tag and the schemas they use
+
+    :returns: ``None`` if the tag is not in the spec
+    """
+    tags = [item for item in spec['tags'] if item['name'] == tag]
+    if not tags:
+        return None
+
+    paths = {}
+    for path, operations in spec['paths'].items():
+        selected = {
+            method: operation for method, operation in operations.items()
+            if tag in operation.get('tags', ())
+        }
+        if selected:
+            paths[path] = selected
+
+    schemas = spec['components']['schemas']
+    names = collect_refs(paths, schemas)
+    return {
+        **spec,
+        'tags': tags,
+        'paths': paths,
+        'components': {
+            **spec['components'],
+            'schemas': {name: schema for name, schema in schemas.items() if name in names},
+        },
+    }
+
+
+def cache_info():
+    """
+    hit/miss counters of the shared caches
+
+    :returns: dict of name -> ``functools._CacheInfo``
+    """
+    return {
+        'parse_path': _parse_path.cache_info(),
+        'summary_desc': _summary_desc.cache_info(),
+        'class_doc': get_class_doc.cache_info(),
+    }
+
+
+def cache_clear():
+    """
+    clear the shared caches
+    """
+    for func in (_parse_path, _summary_desc, get_class_doc):
+        func.cache_clear()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_path(path):
     subs, parameters = [], []
     for segment in path.strip('/').split('/'):
         matches = _FIELD_PATTERN.finditer(segment)
@@ -102,4 +296,4 @@ def parse_path(path):
                 'schema': schema,
             })
 
-    return f'/{"/".join(subs)}', parameters
+    return f'/{"/".join(subs)}', tuple(parameters)
@@ -0,0 +1,509 @@
+"""
+request validation steps used by :meth:`falibrary.Falibrary.validate`
+"""
+import io
+import random
+import warnings
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+
+import falcon
+from falcon.request_helpers import BoundedStream
+from pydantic import ValidationError, BaseModel
+
+from falibrary.batch import BatchValidator
+from falibrary.stream import (
+    iter_json_array, iter_models, iter_json_bytes, aiter_json_bytes)
+from falibrary.limits import (
+    BoundedReader, AsyncBoundedReader, limit_items, check_items)
+from falibrary.route import AsyncMappedReader
+
+MEDIA_NDJSON = 'application/x-ndjson'
+# NOTE shadow checks of responses run one by one off the request thread
+_shadow_executor = None
+
+
+def unprocessable(err):
+    """
+    convert ``pydantic.ValidationError`` to HTTP 422 error
+    """
+    return falcon.HTTPUnprocessableEntity(
+        title='Schema failed validation',
+        description=str(err),
+    )
+
+
+def check_body_size(req, limit):
+    """
+    reject the request before reading the body if ``Content-Length`` is
+    larger than the limit
+
+    :param limit: max body size in bytes, ``None`` means no limit
+    """
+    if limit is not None and (req.content_length or 0) > limit:
+        raise falcon.HTTPPayloadTooLarge(
+            title='Request body is too large',
+            description=f'Request body should be no more than {limit} bytes',
+        )
+
+
+def decode_media(body, api):
+    """
+    decode the JSON body with the serializer of ``api``
+
+    an empty body is treated as ``{}``
+    """
+    if not body:
+        return {}
+
+    try:
+        return api.serializer.loads(body)
+    except ValueError as err:
+        raise falcon.HTTPBadRequest(
+            title='Invalid JSON',
+            description=f'Could not parse JSON body - {err}',
+        )
+
+
+def is_json(req):
+    """
+    check if the body is decoded by the serializer, other media types are
+    left to the media handlers of Falcon (same as ``req.media``)
+    """
+    content_type = req.content_type
+    if not content_type:
+        return True
+    media_type = content_type.partition(';')[0].strip().lower()
+    return media_type == 'application/json' or media_type.endswith('+json')
+
+
+def keep_media(req, body, media):
+    """
+    cache the decoded body, so ``req.media`` still works in the responder
+
+    :returns: ``media``
+    """
+    # NOTE both Falcon 2 and 3 return the cached ``_media`` if it's set, an
+    # empty body is left as it is, so ``req.media`` behaves like Falcon's
+    if body:
+        req._media = media
+    return media
+
+
+def replay_body(req, body, is_async=False):
+    """
+    replace the consumed body stream with the raw body, ``req.media``
+    decodes it again only if the responder uses it
+    """
+    if is_async:
+        req._stream = AsyncMappedReader(body)
+    else:
+        req._bounded_stream = BoundedStream(io.BytesIO(body), len(body))
+
+
+def handler_media(req, api, max_body=None):
+    """
+    decode the body with the media handlers of Falcon, an empty body is
+    treated as ``{}``
+    """
+    check_body_size(req, body_limit(max_body, api))
+    # NOTE Falcon 2 doesn't have ``get_media``
+    if hasattr(req, 'get_media'):
+        return req.get_media(default_when_empty={})
+    return req.media or {}
+
+
+async def handler_media_async(req, api, max_body=None):
+    """
+    coroutine version of :func:`handler_media` for ASGI request
+    """
+    check_body_size(req, body_limit(max_body, api))
+    return await req.get_media(default_when_empty={})
+
+
+def load_media(req, api, max_body=None):
+    """
+    read and decode the body, see :func:`decode_media`
+    """
+    if not is_json(req):
+        return handler_media(req, api, max_body)
+    body = read_body(req, api, max_body)
+    return keep_media(req, body, decode_media(body, api))
+
+
+async def load_media_async(req, api, max_body=None):
+    """
+    coroutine version of :func:`load_media` for ASGI request
+    """
+    if not is_json(req):
+        return await handler_media_async(req, api, max_body)
+    body = await read_body_async(req, api, max_body)
+    return keep_media(req, body, decode_media(body, api))
+
+
+def body_limit(max_body, api):
+    """
+    :returns: ``max_body`` of the route, or ``Config.MAX_BODY_SIZE``
+    """
+    return api.config.MAX_BODY_SIZE if max_body is None else max_body
+
+
+def body_stream(req, limit, is_async=False):
+    """
+    get the body stream, it's bounded by ``limit`` in case there is no
+    ``Content-Length`` header
+    """
+    check_body_size(req, limit)
+    if limit is None:
+        return req.bounded_stream
+    reader = AsyncBoundedReader if is_async else BoundedReader
+    return reader(req.bounded_stream, limit)
+
+
+def read_body(req, api, max_body=None):
+    """
+    read the raw body
+
+    :param max_body: max body size of the route
+    """
+    return body_stream(req, body_limit(max_body, api)).read()
+
+
+async def read_body_async(req, api, max_body=None):
+    """
+    read the raw body of ASGI request
+    """
+    return await body_stream(req, body_limit(max_body, api), is_async=True).read()
+
+
+def should_offload(body, api):
+    """
+    check if the body is larger than ``Config.OFFLOAD_THRESHOLD``
+    """
+    threshold = api.config.OFFLOAD_THRESHOLD
+    return threshold is not None and len(body) > threshold
+
+
+def media_validator(data, batch=False, max_items=None, lazy=False):
+    """
+    build the function that validates the decoded JSON body
+
+    :param batch: the body is a JSON array of ``data``, it's validated
+        column by column, ``'columns'`` returns a dict of field -> values
+        instead of a list of models
+    :param max_items: max length of the JSON array for ``batch``
+    :param lazy: return :class:`falibrary.lazy.LazyData`, fields are
+        validated when they are accessed
+    """
+    if lazy:
+        # NOTE ``falibrary.lazy`` imports this module
+        from falibrary.lazy import LazyValidator
+        return LazyValidator(data)
+
+    if batch:
+        validator = BatchValidator(data)
+        validate = (
+            validator.validate_columns if batch == 'columns' else validator.validate_rows)
+        if max_items is None:
+            return validate
+        return lambda media: validate(check_items(media, max_items))
+
+    def validate(media):
+        return data(**media)
+    return validate
+
+
+def body_parser(data, api, stream=False, batch=False, is_async=False, max_body=None,
+                max_items=None, lazy=False):
+    """
+    build the function that turns the request body into the ``data`` model
+
+    :param stream: the body is a JSON array of ``data``, it's parsed and
+        validated lazily as a generator
+    :param batch: see :func:`media_validator`
+    :param is_async: build a coroutine function for ASGI request
+    :param max_body: max body size in bytes (default: ``Config.MAX_BODY_SIZE``)
+    :param max_items: max length of the JSON array for ``stream`` and ``batch``
+    :param lazy: see :func:`media_validator`
+    :returns: ``None`` if there is no ``data`` model
+    """
+    if data is None:
+        return None
+
+    if stream:
+        assert not is_async, 'stream is not supported by async responders'
+
+        def parse(req):
+            items = iter_json_array(body_stream(req, body_limit(max_body, api)))
+            if max_items is not None:
+                items = limit_items(items, max_items)
+            return iter_models(data, items)
+        return parse
+
+    validate = media_validator(data, batch, max_items, lazy)
+    if batch or lazy:
+        if is_async:
+            async def parse(req):
+                return validate(await load_media_async(req, api, max_body))
+        else:
+            def parse(req):
+                return validate(load_media(req, api, max_body))
+        return parse
+
+    # NOTE only plain models are offloaded, see ``Config.OFFLOAD_THRESHOLD``
+    if is_async:
+        async def parse(req):
+            if not is_json(req):
+                return validate(await handler_media_async(req, api, max_body))
+            body = await read_body_async(req, api, max_body)
+            if should_offload(body, api):
+                replay_body(req, body, is_async=True)
+                return await api.offloader.run_async(data, body)
+            return validate(keep_media(req, body, decode_media(body, api)))
+    else:
+        def parse(req):
+            if not is_json(req):
+                return validate(handler_media(req, api, max_body))
+            body = read_body(req, api, max_body)
+            if should_offload(body, api):
+                replay_body(req, body)
+                return api.offloader.run(data, body)
+            return validate(keep_media(req, body, decode_media(body, api)))
+    return parse
+
+
+def request_loader(query, parse):
+    """
+    build the function that validates the request and stores models in
+    ``req.context``, only the parts declared by the route are handled
+
+    the request body is only read when there is a ``data`` model
+
+    :param query: function to get ``query`` from request, see
+        :class:`falibrary.query.QueryDecoder`
+    :param parse: function to get ``data`` from request, see :func:`body_parser`
+    :returns: ``None`` if there is nothing to validate
+    """
+    if query and parse:
+        def load(req):
+            try:
+                req.context.query = query(req)
+                req.context.data = parse(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    elif query:
+        def load(req):
+            try:
+                req.context.query = query(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    elif parse:
+        def load(req):
+            try:
+                req.context.data = parse(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    else:
+        load = None
+    return load
+
+
+def async_request_loader(query, parse):
+    """
+    coroutine version of :func:`request_loader` for ASGI request
+
+    :param parse: coroutine function to get ``data`` from request
+    """
+    if query and parse:
+        async def load(req):
+            try:
+                req.context.query = query(req)
+                req.context.data = await parse(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    elif query:
+        async def load(req):
+            try:
+                req.context.query = query(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    elif parse:
+        async def load(req):
+            try:
+                req.context.data = await parse(req)
+            except ValidationError as err:
+                raise unprocessable(err)
+    else:
+        load = None
+    return load
+
+
+def report_violation(operation, err):
+    """
+    default callback for responses that don't match the ``resp`` model
+    """
+    warnings.warn(
+        f'response of {operation} failed validation: {err}', RuntimeWarning)
+
+
+def shadow_executor():
+    global _shadow_executor
+    if _shadow_executor is None:
+        _shadow_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='falibrary-shadow')
+    return _shadow_executor
+
+
+def response_checker(resp, api, rate, operation):
+    """
+    build the function that checks a sample of raw responses (dict or JSON)
+    against the ``resp`` model, violations are sent to
+    ``Config.RESP_VIOLATION`` and never fail the request
+
+    :param rate: ratio of responses to check, from 0 to 1
+    :param operation: ``operationID`` of the route passed to the callback
+    :returns: ``None`` if nothing would be checked
+    """
+    if resp is None or not rate:
+        return None
+
+    callback = api.config.RESP_VIOLATION or report_violation
+
+    def validate(payload):
+        try:
+            if isinstance(payload, (bytes, str)):
+                payload = api.serializer.loads(payload)
+            resp.parse_obj(payload)
+        except ValueError as err:
+            # NOTE ``ValidationError`` is also a ``ValueError``
+            callback(operation, err)
+
+    if api.config.RESP_SHADOW:
+        def run(payload):
+            shadow_executor().submit(validate, payload)
+    else:
+        run = validate
+
+    if rate >= 1:
+        return run
+
+    def check(payload):
+        if random.random() < rate:
+            run(payload)
+    return check
+
+
+def raw_payload(resp):
+    """
+    get the payload set by responder: ``media``, ``data`` or the text body
+    """
+    if resp.media is not None:
+        return resp.media
+    if resp.data is not None:
+        return resp.data
+    # NOTE ``body`` is renamed to ``text`` in Falcon 3
+    return resp.text if hasattr(type(resp), 'text') else resp.body
+
+
+def response_dumper(resp, api, is_async=False, check=None):
+    """
+    build the function that writes the returned value of responder
+
+    * ``resp`` instance is encoded to JSON bytes
+    * dict is encoded to JSON bytes as is
+    * iterable of ``resp`` instances (or dicts) is validated and streamed as
+      a JSON array, or NDJSON if the client accepts ``application/x-ndjson``,
+      async iterables are also accepted by async responders
+    * ``None`` leaves the response untouched
+
+    :param is_async: write the stream as async iterable for ASGI response
+    :param check: function to check the dict returned or the payload set by
+        responder, see :func:`response_checker`
+    :returns: ``None`` if there is no ``resp`` model
+    """
+    if resp is None:
+        return None
+
+    stream = aiter_json_bytes if is_async else iter_json_bytes
+
+    def dump(req, _resp, response):
+        if isinstance(response, BaseModel):
+            _resp.data = api.serializer.dump_model(response)
+            _resp.content_type = falcon.MEDIA_JSON
+        elif isinstance(response, dict):
+            if check:
+                check(response)
+            _resp.data = api.serializer.dumps(response)
+            _resp.content_type = falcon.MEDIA_JSON
+        elif response is not None:
+            ndjson = MEDIA_NDJSON in (req.get_header('Accept') or '')
+            _resp.stream = stream(resp, response, api.serializer.dump_model, ndjson)
+            _resp.content_type = MEDIA_NDJSON if ndjson else falcon.MEDIA_JSON
+        elif check:
+            payload = raw_payload(_resp)
+            if payload is not None:
+                check(payload)
+    return dump
+
+
+def sync_wrapper(func, load, dump):
+    """
+    wrap the responder with only the steps it needs
+
+    :param load: see :func:`request_loader`
+    :param dump: see :func:`response_dumper`
+    """
+    if load and dump:
+        @wraps(func)
+        def validation(_self, _req, _resp, *args, **kwargs):
+            load(_req)
+            response = func(_self, _req, _resp, *args, **kwargs)
+            dump(_req, _resp, response)
+            return response
+    elif load:
+        @wraps(func)
+        def validation(_self, _req, _resp, *args, **kwargs):
+            load(_req)
+            return func(_self, _req, _resp, *args, **kwargs)
+    elif dump:
+        @wraps(func)
+        def validation(_self, _req, _resp, *args, **kwargs):
+            response = func(_self, _req, _resp, *args, **kwargs)
+            dump(_req, _resp, response)
+            return response
+    else:
+        @wraps(func)
+        def validation(*args, **kwargs):
+            return func(*args, **kwargs)
+    return validation
+
+
+def async_wrapper(func, load, dump):
+    """
+    coroutine version of :func:`sync_wrapper` for ``async def`` responders
+
+    :param load: see :func:`async_request_loader`
+    """
+    if load and dump:
+        @wraps(func)
+        async def validation(_self, _req, _resp, *args, **kwargs):
+            await load(_req)
+            response = await func(_self, _req, _resp, *args, **kwargs)
+            dump(_req, _resp, response)
+            return response
+    elif load:
+        @wraps(func)
+        async def validation(_self, _req, _resp, *args, **kwargs):
+            await load(_req)
+            return await func(_self, _req, _resp, *args, **kwargs)
+    elif dump:
+        @wraps(func)
+        async def validation(_self, _req, _resp, *args, **kwargs):
+            response = await func(_self, _req, _resp, *args, **kwargs)
+            dump(_req, _resp, response)
+            return response
+    else:
+        @wraps(func)
+        async def validation(*args, **kwargs):
+            return await func(*args, **kwargs)
+    return validation
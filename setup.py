@@ -21,7 +21,7 @@ setup(
     long_description=readme,
     long_description_content_type='text/markdown',
     url='https://github.com/kemingy/falibrary',
-    packages=find_packages(exclude=['examples*', 'tests*']),
+    packages=find_packages(exclude=['examples*', 'tests*', 'benchmarks*']),
     package_data={
         'falibrary': ['templates/*.html'],
     },
@@ -30,8 +30,12 @@ setup(
     ],
     install_requires=requires,
     zip_safe=False,
-    extras_require={},
+    extras_require={
+        'brotli': ['brotli'],
+    },
     entry_points={
-        'console_scripts': [],
+        'console_scripts': [
+            'falibrary = falibrary.__main__:main',
+        ],
     },
 )
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.route import AsyncDocPage, AsyncOpenAPI
+
+asgi = pytest.importorskip('falcon.asgi')
+
+
+class Query(BaseModel):
+    text: str
+
+
+class Data(BaseModel):
+    uid: int
+
+
+class Response(BaseModel):
+    label: int
+
+
+api = Falibrary()
+
+
+class Demo:
+    @api.validate(query=Query, data=Data, resp=Response)
+    async def on_post(self, req, resp):
+        return Response(label=req.context.data.uid + len(req.context.query.text))
+
+    @api.validate(resp=Response)
+    async def on_get(self, req, resp):
+        async def labels():
+            for i in range(3):
+                yield {'label': i}
+        return labels()
+
+
+app = asgi.App()
+app.add_route('/demo', Demo())
+api.register(app)
+client = testing.TestClient(app)
+
+offload_api = Falibrary(offload_threshold=16, offload_executor='thread')
+
+
+class Media:
+    @offload_api.validate(data=Data)
+    async def on_post(self, req, resp):
+        resp.media = {'uid': req.context.data.uid, 'media': await req.get_media()}
+
+
+media_app = asgi.App()
+media_app.add_route('/media', Media())
+offload_api.register(media_app)
+
+
+def test_asgi_validate():
+    resp = client.simulate_post('/demo', params={'text': 'abc'}, json={'uid': 1})
+    assert resp.json == {'label': 4}
+    resp = client.simulate_post('/demo', params={'text': 'abc'}, json={'uid': 'x'})
+    assert resp.status_code == 422
+    assert client.simulate_post('/demo', json={'uid': 1}).status_code == 422
+
+
+def test_asgi_req_media():
+    media_client = testing.TestClient(media_app)
+    try:
+        for body in ({'uid': 1}, {'uid': 1, 'note': 'x' * 32}):
+            resp = media_client.simulate_post('/media', json=body)
+            assert resp.json == {'uid': 1, 'media': body}
+    finally:
+        offload_api.offloader.shutdown()
+
+
+def test_asgi_stream_response():
+    resp = client.simulate_get('/demo')
+    assert resp.json == [{'label': i} for i in range(3)]
+
+
+def test_asgi_doc():
+    assert isinstance(api._doc_page, AsyncDocPage)
+    assert isinstance(api._openapi, AsyncOpenAPI)
+    assert client.simulate_get('/apidoc').status_code == 200
+    resp = client.simulate_get('/apidoc/openapi.json')
+    assert json.loads(resp.content) == api.spec
+    assert '/demo' in api.spec['paths']
@@ -0,0 +1,166 @@
+from typing import List, Optional, Union
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import (
+    BaseModel, Field, ValidationError, confloat, root_validator, validator)
+from pydantic.typing import Literal
+
+from falibrary import Falibrary
+from falibrary.batch import BatchValidator
+
+
+class Point(BaseModel):
+    x: int
+
+
+class Record(BaseModel):
+    uid: int = Field(..., ge=0, le=1000)
+    name: str = Field('unknown', max_length=8)
+    score: float
+    vip: bool = False
+    point: Optional[Point] = None
+    tags: List[str] = []
+
+
+class Ordered(BaseModel):
+    low: int
+    high: int
+
+    @root_validator
+    def check(cls, values):
+        assert values.get('low', 0) <= values.get('high', 0), 'low > high'
+        return values
+
+
+class Range(BaseModel):
+    a: int
+    b: int
+
+    @validator('b')
+    def check_b(cls, v, values):
+        assert v > values['a'], 'b <= a'
+        return v
+
+
+ROWS = [
+    {'uid': 1, 'score': 2},
+    {'uid': '3', 'name': 'abc', 'score': '1.5', 'vip': 'true', 'point': {'x': '2'},
+     'tags': ['a']},
+]
+
+
+def test_batch_same_as_pydantic():
+    validator = BatchValidator(Record)
+    records = validator.validate_rows(ROWS)
+    assert records == [Record(**row) for row in ROWS]
+    assert records[0].__fields_set__ == {'uid', 'score'}
+    columns = validator.validate_columns(ROWS)
+    assert columns['uid'] == [1, 3]
+    assert columns['score'] == [2.0, 1.5]
+    assert columns['point'] == [None, Point(x=2)]
+
+
+def test_batch_errors():
+    rows = [{'uid': 1001, 'score': 1}, {'name': 'too long name', 'score': 'x'}]
+    with pytest.raises(ValidationError) as exc:
+        BatchValidator(Record).validate_rows(rows)
+    assert [err['loc'] for err in exc.value.errors()] == [
+        (0, 'uid'), (1, 'uid'), (1, 'name'), (1, 'score')]
+
+    with pytest.raises(ValidationError):
+        BatchValidator(Record).validate_rows({'uid': 1})
+
+
+def test_batch_root_validator():
+    validator = BatchValidator(Ordered)
+    assert validator.per_row
+    assert validator.validate_rows([{'low': 1, 'high': 2}]) == [Ordered(low=1, high=2)]
+    with pytest.raises(ValidationError) as exc:
+        validator.validate_rows([{'low': 1, 'high': 2}, {'low': 3, 'high': 2}])
+    assert exc.value.errors()[0]['loc'] == (1, '__root__')
+
+
+def test_batch_field_validator():
+    validator = BatchValidator(Range)
+    assert validator.per_row
+    with pytest.raises(ValidationError) as exc:
+        validator.validate_rows([{'a': 1, 'b': 2}, {'a': 3, 'b': 1}])
+    assert exc.value.errors()[0]['loc'] == (1, 'b')
+
+
+class Choice(BaseModel):
+    kind: Literal['a', 'b']
+    value: Union[int, str]
+
+
+class Const(BaseModel):
+    c: int = Field(1, const=True)
+
+
+class Finite(BaseModel):
+    x: confloat(allow_inf_nan=False)
+
+
+class FiniteConfig(BaseModel):
+    x: float
+
+    class Config:
+        allow_inf_nan = False
+
+
+def per_row(model, rows):
+    try:
+        return [model.parse_obj(row) for row in rows]
+    except ValidationError:
+        return None
+
+
+@pytest.mark.parametrize('model, rows', [
+    (Choice, [{'kind': 'a', 'value': 1}, {'kind': 'b', 'value': 'x'}]),
+    (Choice, [{'kind': 'c', 'value': 1}]),
+    (Const, [{'c': 1}, {}]),
+    (Const, [{'c': 2}]),
+    (Finite, [{'x': 1.5}]),
+    (Finite, [{'x': float('inf')}]),
+    (FiniteConfig, [{'x': float('nan')}]),
+])
+def test_batch_same_as_per_row(model, rows):
+    expect = per_row(model, rows)
+    if expect is None:
+        with pytest.raises(ValidationError):
+            BatchValidator(model).validate_rows(rows)
+    else:
+        assert BatchValidator(model).validate_rows(rows) == expect
+
+
+api = Falibrary()
+
+
+class Bulk:
+    @api.validate(data=List[Record], batch=True)
+    def on_post(self, req, resp):
+        resp.media = {'uids': [record.uid for record in req.context.data]}
+
+    @api.validate(data=Record, batch='columns')
+    def on_put(self, req, resp):
+        resp.media = {'uids': req.context.data['uid']}
+
+
+app = falcon.API()
+app.add_route('/bulk', Bulk())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_batch_route():
+    assert client.simulate_post('/bulk', json=ROWS).json == {'uids': [1, 3]}
+    assert client.simulate_put('/bulk', json=ROWS).json == {'uids': [1, 3]}
+
+    resp = client.simulate_post('/bulk', json=[{'uid': -1, 'score': 1}])
+    assert resp.status_code == 422
+    assert '0 -> uid' in resp.json['description']
+
+    schema = api.spec['paths']['/bulk']['post']['requestBody']['content']
+    assert schema['application/json']['schema']['type'] == 'array'
@@ -0,0 +1,59 @@
+import gzip
+import json
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.__main__ import main
+from falibrary.build import find_api, FINGERPRINT
+
+
+class Query(BaseModel):
+    text: str
+
+
+api = Falibrary(title='prebuilt')
+
+
+class Search:
+    @api.validate(query=Query)
+    def on_get(self, req, resp):
+        pass
+
+
+app = falcon.API()
+app.add_route('/search', Search())
+api.register(app)
+
+
+def test_find_api():
+    assert find_api('tests.test_build:api') is api
+    assert find_api('tests.test_build:app') is api
+
+
+def test_build_and_load(tmp_path):
+    output = str(tmp_path / 'openapi.json')
+    assert main(['build-spec', 'tests.test_build:app', '-o', output]) == 0
+    with open(output, 'rb') as f:
+        spec = json.load(f)
+    assert spec[FINGERPRINT] == api.fingerprint()
+    assert spec['paths'] == api.spec['paths']
+    with open(output + '.gz', 'rb') as f:
+        assert json.loads(gzip.decompress(f.read())) == spec
+
+    loaded = Falibrary(title='prebuilt', spec_file=output)
+    loaded_app = falcon.API()
+    loaded_app.add_route('/search', Search())
+    loaded.register(loaded_app)
+    loaded.update_config(mode='greedy')
+
+    resp = testing.TestClient(loaded_app).simulate_get('/apidoc/openapi.json')
+    assert resp.json == spec
+
+    loaded_app.add_route('/another', Search())
+    loaded.update_config(spec_file=output)
+    with pytest.warns(RuntimeWarning):
+        assert loaded.spec == spec
@@ -0,0 +1,103 @@
+import time
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.cache import LRUCache
+
+
+class Query(BaseModel):
+    text: str
+
+
+class Response(BaseModel):
+    text: str
+    name: str
+    calls: int
+
+
+api = Falibrary()
+calls = []
+
+
+class Echo:
+    @api.validate(query=Query, resp=Response, cache=True)
+    def on_get(self, req, resp, name):
+        calls.append(name)
+        if name == 'missing':
+            resp.status = falcon.HTTP_404
+        return Response(text=req.context.query.text, name=name, calls=len(calls))
+
+
+class Version:
+    @api.validate(resp=Response, cache=True)
+    def on_get(self, req, resp):
+        calls.append(req.path)
+        return Response(text=req.path, name='version', calls=len(calls))
+
+
+app = falcon.API()
+app.add_route('/echo/{name}', Echo())
+version = Version()
+app.add_route('/v1/version', version)
+app.add_route('/v2/version', version)
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_cached_response():
+    api.cache_backend.clear()
+    calls.clear()
+    first = client.simulate_get('/echo/a', params={'text': 'x'})
+    assert first.status_code == 200
+    again = client.simulate_get('/echo/a', params={'text': 'x', 'unknown': '1'})
+    assert again.json == first.json
+    assert again.headers['content-type'] == falcon.MEDIA_JSON
+    assert calls == ['a']
+
+    client.simulate_get('/echo/b', params={'text': 'x'})
+    client.simulate_get('/echo/a', params={'text': 'y'})
+    assert calls == ['a', 'b', 'a']
+
+    # NOTE invalid requests are rejected before the cache
+    assert client.simulate_get('/echo/a').status_code == 422
+
+
+def test_mounted_twice():
+    api.cache_backend.clear()
+    calls.clear()
+    for path in ('/v1/version', '/v2/version', '/v1/version'):
+        assert client.simulate_get(path).json['text'] == path
+    assert calls == ['/v1/version', '/v2/version']
+
+
+def test_not_cached():
+    calls.clear()
+    for _ in range(2):
+        assert client.simulate_get('/echo/missing', params={'text': 'x'}).status_code == 404
+    assert calls == ['missing', 'missing']
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    cache.set('d', 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('d') is None
+    assert cache.stats() == {
+        'hits': 1, 'misses': 2, 'evictions': 2, 'size': 1, 'maxsize': 2}
+
+
+def test_only_get():
+    with pytest.raises(AssertionError):
+        class Post:
+            @api.validate(cache=10)
+            def on_post(self, req, resp):
+                pass
@@ -0,0 +1,18 @@
+import sys
+import subprocess
+
+
+def test_import_without_pkg_resources():
+    code = 'import sys, falibrary; assert "pkg_resources" not in sys.modules'
+    subprocess.check_call([sys.executable, '-c', code])
+
+
+def test_import_without_asyncio():
+    # NOTE only the modules imported by falibrary itself, Falcon 3 imports
+    # asyncio on its own
+    code = (
+        'import sys, falcon, pydantic; before = set(sys.modules); import falibrary; '
+        'new = set(sys.modules) - before; '
+        'assert not {"asyncio", "multiprocessing"} & new, new'
+    )
+    subprocess.check_call([sys.executable, '-c', code])
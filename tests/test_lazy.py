@@ -0,0 +1,108 @@
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel, Extra, Field, ValidationError, root_validator, validator
+
+from falibrary import Falibrary
+from falibrary.lazy import LazyValidator
+
+
+class Data(BaseModel):
+    uid: int
+    name: str = Field(..., max_length=4)
+    score: float = 0.5
+
+
+api = Falibrary()
+
+
+class Lazy:
+    @api.validate(data=Data, lazy=True)
+    def on_post(self, req, resp):
+        data = req.context.data
+        if req.get_param('all'):
+            data.validate_all()
+        resp.media = {'uid': data.uid, 'score': data.score}
+
+
+app = falcon.API()
+app.add_route('/lazy', Lazy())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_lazy():
+    resp = client.simulate_post('/lazy', json={'uid': '1', 'name': 'toolong'})
+    assert resp.json == {'uid': 1, 'score': 0.5}
+
+    resp = client.simulate_post('/lazy', json={'uid': 'x', 'name': 'a'})
+    assert resp.status_code == 422
+
+    resp = client.simulate_post(
+        '/lazy', json={'uid': 1, 'name': 'toolong'}, params={'all': '1'})
+    assert resp.status_code == 422
+
+
+def test_required():
+    resp = client.simulate_post('/lazy', json={'uid': 1})
+    assert resp.status_code == 422
+    assert 'name' in resp.json['description']
+    assert client.simulate_post('/lazy', json=[]).status_code == 422
+
+
+def test_proxy():
+    data = LazyValidator(Data)({'uid': '2', 'name': 'a'})
+    assert data.uid == 2
+    assert data.dict() == {'uid': 2, 'name': 'a', 'score': 0.5}
+    with pytest.raises(AttributeError):
+        data.missing
+
+
+def test_unsupported():
+    class Forbid(BaseModel, extra=Extra.forbid):
+        uid: int
+
+    with pytest.raises(ValidationError):
+        LazyValidator(Forbid)({'uid': 1, 'other': 2})
+
+    class Root(BaseModel):
+        uid: int
+
+        @root_validator
+        def check(cls, values):
+            return values
+
+    with pytest.raises(AssertionError):
+        LazyValidator(Root)
+
+
+def test_population_by_field_name():
+    class Named(BaseModel):
+        user_id: int = Field(..., alias='userId')
+
+        class Config:
+            allow_population_by_field_name = True
+            extra = Extra.forbid
+
+    validator = LazyValidator(Named)
+    for media in ({'userId': '1'}, {'user_id': '1'}):
+        assert validator(media).user_id == Named(**media).user_id == 1
+    with pytest.raises(ValidationError):
+        validator({'uid': 1})
+
+
+class Span(BaseModel):
+    lo: int
+    hi: int
+
+    @validator('hi')
+    def check_hi(cls, value, values):
+        assert value >= values['lo'], 'hi < lo'
+        return value
+
+
+def test_field_validator_values():
+    validator = LazyValidator(Span)
+    assert validator({'lo': '1', 'hi': '2'}).hi == 2
+    with pytest.raises(falcon.HTTPUnprocessableEntity):
+        validator({'lo': 3, 'hi': 2}).hi
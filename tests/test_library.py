@@ -0,0 +1,103 @@
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Query(BaseModel):
+    text: str
+
+
+class Data(BaseModel):
+    uid: str
+    limit: int
+
+
+class Response(BaseModel):
+    label: int
+
+
+api = Falibrary()
+
+
+class Plain:
+    @api.validate(tags=['plain'])
+    def on_get(self, req, resp, name):
+        resp.media = {'name': name}
+
+
+class Full:
+    @api.validate(query=Query, data=Data, resp=Response)
+    def on_post(self, req, resp):
+        return Response(label=len(req.context.query.text) + req.context.data.limit)
+
+
+class QueryOnly:
+    @api.validate(query=Query)
+    def on_post(self, req, resp):
+        resp.media = {'text': req.context.query.text}
+
+
+class Media:
+    @api.validate(data=Data)
+    def on_post(self, req, resp):
+        resp.media = {'media': req.media}
+
+
+app = falcon.API()
+app.add_route('/plain/{name}', Plain())
+app.add_route('/media', Media())
+app.add_route('/full', Full())
+app.add_route('/query', QueryOnly())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_validate_nothing():
+    resp = client.simulate_get('/plain/falcon')
+    assert resp.json == {'name': 'falcon'}
+    assert Plain.on_get.tags == ['plain']
+    assert Plain.on_get.__name__ == 'on_get'
+
+
+def test_validate_full():
+    resp = client.simulate_post('/full?text=abc', json={'uid': 'a', 'limit': 2})
+    assert resp.status_code == 200
+    assert resp.json == {'label': 5}
+
+    resp = client.simulate_post('/full?text=abc', json={'uid': 'a'})
+    assert resp.status_code == 422
+
+    resp = client.simulate_post('/full', json={'uid': 'a', 'limit': 2})
+    assert resp.status_code == 422
+
+
+def test_validate_query_only():
+    resp = client.simulate_post('/query?text=hi')
+    assert resp.json == {'text': 'hi'}
+    assert client.simulate_post('/query').status_code == 422
+
+
+def test_req_media_in_responder():
+    resp = client.simulate_post('/media', json={'uid': 'a', 'limit': 2})
+    assert resp.json == {'media': {'uid': 'a', 'limit': 2}}
+    resp = client.simulate_post(
+        '/media', body='uid=a', headers={'Content-Type': 'text/plain'})
+    assert resp.status_code == 415
+
+
+def test_query_route_skips_body():
+    resp = client.simulate_post('/query?text=hi', body='not json')
+    assert resp.status_code == 200
+
+
+def test_max_body_size():
+    api.update_config(max_body_size=32)
+    try:
+        resp = client.simulate_post('/full?text=abc', json={'uid': 'a' * 64, 'limit': 2})
+        assert resp.status_code == 413
+        resp = client.simulate_post('/full?text=abc', json={'uid': 'a', 'limit': 2})
+        assert resp.status_code == 200
+    finally:
+        api.update_config(max_body_size=None)
@@ -0,0 +1,96 @@
+import io
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.limits import BoundedReader, TokenBucket
+
+
+class Data(BaseModel):
+    uid: int
+
+
+api = Falibrary()
+
+
+class Upload:
+    @api.validate(data=Data, max_body=32)
+    def on_post(self, req, resp):
+        resp.media = {'uid': req.context.data.uid}
+
+
+class Batch:
+    @api.validate(data=Data, batch=True, max_items=2)
+    def on_post(self, req, resp):
+        resp.media = {'count': len(req.context.data)}
+
+
+class Stream:
+    @api.validate(data=Data, stream=True, max_items=2)
+    def on_post(self, req, resp):
+        resp.media = {'count': sum(1 for _ in req.context.data)}
+
+
+class Limited:
+    @api.validate(rate_limit=(2, 60))
+    def on_get(self, req, resp):
+        resp.media = {}
+
+
+app = falcon.API()
+app.add_route('/upload', Upload())
+app.add_route('/batch', Batch())
+app.add_route('/stream', Stream())
+app.add_route('/limited', Limited())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_max_body():
+    assert client.simulate_post('/upload', json={'uid': 1}).status_code == 200
+    resp = client.simulate_post('/upload', json={'uid': 1, 'padding': 'x' * 32})
+    assert resp.status_code == 413
+
+
+def test_bounded_reader():
+    reader = BoundedReader(io.BytesIO(b'x' * 10), 10)
+    assert reader.read() == b'x' * 10
+    with pytest.raises(falcon.HTTPPayloadTooLarge):
+        BoundedReader(io.BytesIO(b'x' * 11), 10).read()
+
+
+@pytest.mark.parametrize('path', ['/batch', '/stream'])
+def test_max_items(path):
+    resp = client.simulate_post(path, json=[{'uid': 1}, {'uid': 2}])
+    assert resp.json == {'count': 2}
+    resp = client.simulate_post(path, json=[{'uid': 1}, {'uid': 2}, {'uid': 3}])
+    assert resp.status_code == 413
+
+
+def test_rate_limit():
+    assert client.simulate_get('/limited').status_code == 200
+    assert client.simulate_get('/limited').status_code == 200
+    resp = client.simulate_get('/limited')
+    assert resp.status_code == 429
+    assert int(resp.headers['retry-after']) == 30
+
+
+def test_token_bucket():
+    bucket = TokenBucket(1, 0.01)
+    assert bucket.acquire() == 0
+    assert 0 < bucket.acquire() <= 0.01
+
+
+def test_spec():
+    paths = api.spec['paths']
+    upload = paths['/upload']['post']
+    assert upload['requestBody']['x-max-body-size'] == 32
+    assert '413' in upload['responses']
+    schema = paths['/batch']['post']['requestBody']['content']['application/json']['schema']
+    assert schema['maxItems'] == 2
+    limited = paths['/limited']['get']
+    assert limited['x-ratelimit'] == {'limit': 2, 'period': 60}
+    assert '429' in limited['responses']
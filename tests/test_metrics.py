@@ -0,0 +1,105 @@
+from typing import List
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.metrics import InMemoryCollector, operation_id
+
+
+class Query(BaseModel):
+    text: str
+
+
+class Data(BaseModel):
+    uid: str
+    limit: int
+
+
+class Response(BaseModel):
+    label: int
+
+
+collector = InMemoryCollector()
+api = Falibrary(collector=collector)
+
+
+class Full:
+    @api.validate(query=Query, data=Data, resp=Response)
+    def on_post(self, req, resp):
+        return Response(label=req.context.data.limit)
+
+
+class Items:
+    @api.validate(data=List[Data], batch=True)
+    def on_post_batch(self, req, resp):
+        pass
+
+
+class Child(Full):
+    pass
+
+
+app = falcon.API()
+app.add_route('/full', Full())
+app.add_route('/child', Child())
+app.add_route('/items', Items(), suffix='batch')
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_operation_id():
+    assert operation_id(Full.on_post) == 'Full__post'
+    paths = api.spec['paths']
+    assert operation_id(Full.on_post) == paths['/full']['post']['operationID']
+    # NOTE the spec ids are unique, metrics use the class defining the responder
+    assert paths['/child']['post']['operationID'] == 'Child__post'
+    assert paths['/items']['post']['operationID'] == 'Items__post_batch'
+
+
+def test_batch_error_fields():
+    collector.reset()
+    resp = client.simulate_post('/items', json=[{'uid': 'a'}, {'uid': 'b'}])
+    assert resp.status_code == 422
+    assert collector.snapshot()['errors'] == {('Items__post_batch', 'data', 'limit'): 2}
+
+
+def test_collect():
+    collector.reset()
+    resp = client.simulate_post('/full?text=a', json={'uid': 'a', 'limit': 2})
+    assert resp.status_code == 200
+    resp = client.simulate_post('/full?text=a', json={'uid': 'a', 'limit': 'x'})
+    assert resp.status_code == 422
+    resp = client.simulate_post('/full', json={'uid': 'a', 'limit': 1})
+    assert resp.status_code == 422
+
+    snapshot = collector.snapshot()
+    assert snapshot['timings'][('Full__post', 'query')][0] == 3
+    assert snapshot['timings'][('Full__post', 'data')][0] == 2
+    assert snapshot['timings'][('Full__post', 'resp')][0] == 1
+    assert snapshot['errors'] == {
+        ('Full__post', 'data', 'limit'): 1,
+        ('Full__post', 'query', 'text'): 1,
+    }
+    count, total, _ = snapshot['sizes'][('Full__post', 'response')]
+    assert (count, total) == (1, len(b'{"label":2}'))
+    assert snapshot['sizes'][('Full__post', 'request')][0] == 2
+
+    text = collector.export()
+    assert 'falibrary_validation_seconds_count{operation="Full__post",stage="data"} 2' in text
+    assert ('falibrary_validation_errors_total'
+            '{operation="Full__post",stage="query",field="text"} 1') in text
+
+
+def test_disabled():
+    plain = Falibrary()
+
+    class Plain:
+        @plain.validate(query=Query)
+        def on_get(self, req, resp):
+            pass
+
+    # NOTE the model is used as is without the timing wrapper
+    assert plain.config.COLLECTOR is None
+    assert Plain.on_get.query is Query
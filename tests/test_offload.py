@@ -0,0 +1,66 @@
+import pickle
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.metrics import InMemoryCollector
+from falibrary.offload import decode_and_validate
+
+
+class Data(BaseModel):
+    uid: int
+    text: str
+
+
+def make_client(**config):
+    api = Falibrary(offload_threshold=24, **config)
+
+    class Upload:
+        @api.validate(data=Data)
+        def on_post(self, req, resp):
+            resp.media = {'uid': req.context.data.uid, 'media': req.media['uid']}
+
+    app = falcon.API()
+    app.add_route('/upload', Upload())
+    api.register(app)
+    return api, testing.TestClient(app)
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_offload(executor):
+    collector = InMemoryCollector()
+    api, client = make_client(offload_executor=executor, collector=collector)
+    try:
+        resp = client.simulate_post('/upload', json={'uid': 1, 'text': 'x' * 32})
+        assert resp.json == {'uid': 1, 'media': 1}
+        resp = client.simulate_post('/upload', json={'uid': 'x', 'text': 'x' * 32})
+        assert resp.status_code == 422
+        resp = client.simulate_post('/upload', body='{"uid": 1, "text": "' + 'x' * 32)
+        assert resp.status_code == 400
+    finally:
+        api.offloader.shutdown()
+    assert collector.snapshot()['queue'] == (0, 1)
+
+
+def test_small_body_inline():
+    api, client = make_client(offload_executor='thread')
+    resp = client.simulate_post('/upload', json={'uid': 1, 'text': ''})
+    assert resp.json == {'uid': 1, 'media': 1}
+    assert api.offloader._executor is None
+
+
+def test_back_pressure():
+    api, client = make_client(offload_executor='thread', offload_max_pending=0)
+    resp = client.simulate_post('/upload', json={'uid': 1, 'text': 'x' * 32})
+    assert resp.status_code == 503
+    assert resp.headers['retry-after'] == '1'
+
+
+def test_picklable():
+    func = pickle.loads(pickle.dumps(decode_and_validate))
+    assert func(Data, b'{"uid": 1, "text": "a"}', 'json') == Data(uid=1, text='a')
+    with pytest.raises(ValueError):
+        func(Data, b'{', 'json')
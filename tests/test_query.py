@@ -0,0 +1,136 @@
+from typing import List, Optional, Union
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel, Field, ValidationError, validator
+from pydantic.typing import Literal
+
+from falibrary import Falibrary
+from falibrary.query import QueryDecoder
+
+
+class Query(BaseModel):
+    text: str = Field(..., max_length=8)
+    limit: int = Field(10, ge=1, le=100)
+    score: float = 0.5
+    vip: bool = False
+    tags: List[str] = []
+    ids: List[int] = []
+    lang: Optional[str] = Field(None, alias='language')
+
+    @validator('text')
+    def strip_text(cls, value):
+        return value.strip()
+
+
+class Request:
+    def __init__(self, query_string):
+        self.query_string = query_string
+        self.options = falcon.RequestOptions()
+
+
+decoder = QueryDecoder(Query)
+
+
+@pytest.mark.parametrize('query_string', [
+    'text=a',
+    'text=a+b&limit=5&score=1&vip=true',
+    'text=a&tags=x&tags=y&ids=1&ids=2',
+    'text=a&language=zh&unknown=1',
+    'text=a&limit=5&limit=6',
+])
+def test_same_as_pydantic(query_string):
+    model = decoder(Request(query_string))
+    expect = Query(**decoder.decode(query_string))
+    assert model == expect
+    assert model.__fields_set__ == expect.__fields_set__
+
+
+class Tagged(BaseModel):
+    limit: int
+    tag: Optional[str] = None
+
+    @validator('tag', always=True)
+    def default_tag(cls, value):
+        return value or 'all'
+
+
+class ValidateAll(BaseModel):
+    limit: int = Field('5', ge=1)
+
+    class Config:
+        validate_all = True
+
+
+@pytest.mark.parametrize('model, query_string, params', [
+    (Tagged, 'limit=5', {'limit': '5'}),
+    (ValidateAll, '', {}),
+])
+def test_always_validators(model, query_string, params):
+    assert QueryDecoder(model)(Request(query_string)) == model(**params)
+
+
+class Choice(BaseModel):
+    kind: Literal['a', 'b']
+    value: Union[int, str]
+
+
+@pytest.mark.parametrize('query_string', ['kind=a&value=1', 'kind=b&value=x'])
+def test_typing_forms(query_string):
+    params = dict(pair.split('=') for pair in query_string.split('&'))
+    assert QueryDecoder(Choice)(Request(query_string)) == Choice(**params)
+    with pytest.raises(ValidationError):
+        QueryDecoder(Choice)(Request('kind=c&value=1'))
+
+
+class Finite(BaseModel):
+    x: float = 0
+
+    class Config:
+        allow_inf_nan = False
+
+
+def test_inf_nan():
+    with pytest.raises(ValidationError):
+        QueryDecoder(Finite)(Request('x=nan'))
+    assert QueryDecoder(Finite)(Request('x=1.5')).x == 1.5
+
+
+def test_decode():
+    assert decoder.decode('text=a&tags=x&tags=y&unknown=1&limit=1&limit=2') == {
+        'text': 'a', 'tags': ['x', 'y'], 'limit': '2'}
+
+
+@pytest.mark.parametrize('query_string, loc', [
+    ('', 'text'),
+    ('text=123456789', 'text'),
+    ('text=a&limit=0', 'limit'),
+    ('text=a&limit=x', 'limit'),
+    ('text=a&ids=1&ids=x', 'ids'),
+    ('text=a&vip=maybe', 'vip'),
+])
+def test_error(query_string, loc):
+    with pytest.raises(ValidationError) as err:
+        decoder(Request(query_string))
+    assert err.value.errors()[0]['loc'][0] == loc
+
+
+def test_route():
+    api = Falibrary()
+
+    class Search:
+        @api.validate(query=Query)
+        def on_get(self, req, resp):
+            resp.media = req.context.query.dict()
+
+    app = falcon.API()
+    app.add_route('/search', Search())
+    api.register(app)
+    client = testing.TestClient(app)
+
+    resp = client.simulate_get('/search', query_string='text=+a+&ids=1&ids=2')
+    assert resp.status_code == 200
+    assert resp.json['text'] == 'a'
+    assert resp.json['ids'] == [1, 2]
+    assert client.simulate_get('/search').status_code == 422
@@ -0,0 +1,83 @@
+import gzip
+import json
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Query(BaseModel):
+    text: str
+
+
+api = Falibrary(title='demo')
+
+
+class Demo:
+    @api.validate(query=Query)
+    def on_get(self, req, resp):
+        resp.media = {'text': req.context.query.text}
+
+
+app = falcon.API()
+app.add_route('/api/demo', Demo())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_spec():
+    resp = client.simulate_get('/apidoc/openapi.json')
+    assert resp.status_code == 200
+    assert resp.json == api.spec
+    assert resp.headers['etag'] == f'"{api.spec_body.etag}"'
+    assert resp.headers['cache-control'] == api.config.CACHE_CONTROL
+    assert 'content-encoding' not in resp.headers
+
+
+def test_spec_not_modified():
+    etag = client.simulate_get('/apidoc/openapi.json').headers['etag']
+    resp = client.simulate_get('/apidoc/openapi.json', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+    assert resp.content == b''
+
+
+def test_spec_gzip():
+    resp = client.simulate_get(
+        '/apidoc/openapi.json',
+        headers={'Accept-Encoding': 'gzip, deflate'},
+    )
+    assert resp.headers['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(resp.content)) == api.spec
+
+    resp = client.simulate_get(
+        '/apidoc/openapi.json',
+        headers={'Accept-Encoding': 'gzip;q=0'},
+    )
+    assert 'content-encoding' not in resp.headers
+
+
+def test_doc_page():
+    resp = client.simulate_get('/apidoc')
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('text/html')
+    assert api.config.SPEC_URL in resp.text
+    assert 'redoc' in resp.text
+
+    resp = client.simulate_get('/apidoc', headers={'If-None-Match': resp.headers['etag']})
+    assert resp.status_code == 304
+
+
+def test_doc_page_update_config():
+    other = Falibrary()
+    other_app = falcon.API()
+    other.register(other_app)
+    other_client = testing.TestClient(other_app)
+    assert 'redoc' in other_client.simulate_get('/apidoc').text
+
+    other.update_config(ui='swagger', path='docs')
+    resp = other_client.simulate_get('/docs')
+    assert 'swagger' in resp.text
+    assert '/docs/openapi.json' in resp.text
+    assert other_client.simulate_get('/docs/openapi.json').status_code == 200
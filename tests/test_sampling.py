@@ -0,0 +1,89 @@
+import warnings
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary import validation
+
+
+class Response(BaseModel):
+    label: int
+
+
+violations = []
+api = Falibrary(resp_violation=lambda operation, err: violations.append(operation))
+
+
+class Always:
+    @api.validate(resp=Response, resp_sample=1)
+    def on_get(self, req, resp):
+        return {'label': req.get_param('label')}
+
+    @api.validate(resp=Response, resp_sample=1)
+    def on_post(self, req, resp):
+        resp.media = {'label': req.get_param('label')}
+
+
+class Never:
+    @api.validate(resp=Response)
+    def on_get(self, req, resp):
+        return {'label': 'x'}
+
+
+app = falcon.API()
+app.add_route('/always', Always())
+app.add_route('/never', Never())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_dict_response():
+    violations.clear()
+    resp = client.simulate_get('/always', params={'label': '1'})
+    assert resp.status_code == 200
+    assert resp.json == {'label': '1'}
+    assert violations == []
+
+    resp = client.simulate_get('/always', params={'label': 'x'})
+    assert resp.status_code == 200
+    assert resp.json == {'label': 'x'}
+    assert violations == ['Always__get']
+
+
+def test_media_response():
+    violations.clear()
+    resp = client.simulate_post('/always', params={'label': 'x'})
+    assert resp.status_code == 200
+    assert violations == ['Always__post']
+
+
+def test_not_sampled():
+    violations.clear()
+    resp = client.simulate_get('/never')
+    assert resp.json == {'label': 'x'}
+    assert violations == []
+
+
+def test_sample_rate(monkeypatch):
+    checked = []
+    api = Falibrary(resp_violation=lambda *args: None)
+    check = validation.response_checker(Response, api, 0.5, 'op')
+    monkeypatch.setattr(Response, 'parse_obj', checked.append)
+    monkeypatch.setattr(validation.random, 'random', lambda: 0.7)
+    check({'label': 1})
+    monkeypatch.setattr(validation.random, 'random', lambda: 0.3)
+    check({'label': 2})
+    assert checked == [{'label': 2}]
+    assert validation.response_checker(Response, api, 0, 'op') is None
+
+
+def test_shadow():
+    api = Falibrary(resp_shadow=True)
+    check = validation.response_checker(Response, api, 1, 'op')
+    with warnings.catch_warnings(record=True) as records:
+        warnings.simplefilter('always')
+        check(b'{"label": "x"}')
+        validation.shadow_executor().submit(lambda: None).result()
+    assert any('op' in str(record.message) for record in records)
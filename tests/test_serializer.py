@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from typing import Dict
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel
+
+from falibrary.serializer import get_serializer, JSONSerializer, SERIALIZERS
+
+
+class Item(BaseModel):
+    uid: UUID
+    created: datetime
+
+
+class Order(BaseModel):
+    items: list
+    item: Item
+    note: str
+
+
+ORDER = Order(
+    items=[1, 'é'],
+    item=Item(uid='12345678-1234-5678-1234-567812345678', created='2020-01-01T00:00:00'),
+    note='中文',
+)
+
+
+@pytest.mark.parametrize('name', [
+    name for name, (_, backend) in SERIALIZERS.items() if backend is not None
+])
+def test_serializer(name):
+    serializer = get_serializer(name)
+    assert serializer.name == name
+    data = serializer.dump_model(ORDER)
+    assert isinstance(data, bytes)
+    assert Order(**serializer.loads(data)) == ORDER
+    assert serializer.loads(serializer.dumps({'note': '中文'})) == {'note': '中文'}
+
+
+class Labels(BaseModel):
+    names: Dict[int, str]
+
+
+@pytest.mark.parametrize('name', [
+    name for name, (_, backend) in SERIALIZERS.items() if backend is not None
+])
+def test_non_str_keys(name):
+    serializer = get_serializer(name)
+    labels = Labels(names={1: 'a'})
+    assert serializer.loads(serializer.dump_model(labels)) == {'names': {'1': 'a'}}
+    assert serializer.loads(serializer.dumps({1: 'a'})) == {'1': 'a'}
+
+
+class Timer(BaseModel):
+    elapsed: timedelta
+
+    class Config:
+        json_encoders = {timedelta: lambda value: 'custom'}
+
+
+@pytest.mark.parametrize('name', [
+    name for name, (_, backend) in SERIALIZERS.items() if backend is not None
+])
+def test_json_encoders(name):
+    data = get_serializer(name).dump_model(Timer(elapsed=5))
+    assert data == JSONSerializer().dump_model(Timer(elapsed=5)) == b'{"elapsed":"custom"}'
+
+
+def test_get_serializer():
+    assert get_serializer('auto') is not None
+    custom = JSONSerializer()
+    assert get_serializer(custom) is custom
+    with pytest.raises(AssertionError):
+        get_serializer('pickle')
@@ -0,0 +1,137 @@
+import json
+from enum import Enum
+import multiprocessing
+
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary import build
+
+
+class Query(BaseModel):
+    text: str
+
+
+api = Falibrary(title='shared')
+
+
+class Search:
+    @api.validate(query=Query)
+    def on_get(self, req, resp):
+        pass
+
+
+app = falcon.API()
+app.add_route('/search', Search())
+api.register(app)
+
+
+def worker(path, log, queue):
+    build_spec = build.build_spec
+
+    def logged(api, output):
+        with open(log, 'a') as f:
+            f.write('built\n')
+        return build_spec(api, output)
+
+    build.build_spec = logged
+    body = build.shared_spec(api, path)
+    queue.put(body.etag)
+
+
+def test_build_once(tmp_path):
+    path, log = str(tmp_path / 'openapi.json'), str(tmp_path / 'log')
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    workers = [ctx.Process(target=worker, args=(path, log, queue)) for _ in range(4)]
+    for process in workers:
+        process.start()
+    etags = {queue.get(timeout=30) for _ in workers}
+    for process in workers:
+        process.join()
+
+    with open(log) as f:
+        assert f.read() == 'built\n'
+    assert len(etags) == 1
+    assert not (tmp_path / 'openapi.json.lock').exists()
+
+
+def test_prebuild(tmp_path):
+    path = str(tmp_path / 'openapi.json')
+    shared = Falibrary(title='shared')
+    shared_app = falcon.API()
+    shared_app.add_route('/search', Search())
+    shared.register(shared_app)
+    body = shared.prebuild(path)
+    assert build.read_fingerprint(path) == shared.fingerprint()
+
+    client = testing.TestClient(shared_app)
+    resp = client.simulate_get('/apidoc/openapi.json')
+    assert resp.headers['etag'] == f'"{body.etag}"'
+    assert resp.json['info']['title'] == 'shared'
+    assert json.loads(resp.content) == resp.json
+
+    # NOTE new routes make the shared spec stale
+    shared_app.add_route('/another', Search())
+    resp = client.simulate_get('/apidoc/openapi.json')
+    assert '/another' in resp.json['paths']
+    assert build.read_fingerprint(path) == shared.fingerprint()
+
+
+def test_config_and_models_change(tmp_path):
+    path = str(tmp_path / 'openapi.json')
+
+    def make(version, model):
+        shared = Falibrary(version=version, shared_spec=path)
+
+        class Detail:
+            @shared.validate(query=model)
+            def on_get(self, req, resp):
+                pass
+
+        shared_app = falcon.API()
+        shared_app.add_route('/detail', Detail())
+        shared.register(shared_app)
+        return testing.TestClient(shared_app)
+
+    resp = make('1.0', Query).simulate_get('/apidoc/openapi.json')
+    assert resp.json['info']['version'] == '1.0'
+    resp = make('2.0', Query).simulate_get('/apidoc/openapi.json')
+    assert resp.json['info']['version'] == '2.0'
+
+    # NOTE same qualified name, only the fields are changed
+    class Changed(BaseModel):
+        text: str
+        limit: int = 10
+
+    Changed.__name__ = Changed.__qualname__ = 'Query'
+    resp = make('2.0', Changed).simulate_get('/apidoc/openapi.json')
+    assert 'limit' in resp.json['components']['schemas']['Query']['properties']
+
+
+class Color(Enum):
+    red = 'red'
+    blue = 'blue'
+
+
+class Paint(BaseModel):
+    color: Color
+
+
+def test_enum_fingerprint(tmp_path):
+    path = str(tmp_path / 'openapi.json')
+    shared = Falibrary()
+
+    class Brush:
+        @shared.validate(data=Paint)
+        def on_post(self, req, resp):
+            pass
+
+    shared_app = falcon.API()
+    shared_app.add_route('/brush', Brush())
+    shared.register(shared_app)
+    body = shared.prebuild(path)
+    assert build.read_fingerprint(path) == shared.fingerprint()
+    assert b'"blue"' in body.variants['identity'][:]
@@ -0,0 +1,124 @@
+import falcon
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Point(BaseModel):
+    x: int
+
+
+class Shape(BaseModel):
+    points: list
+    center: Point
+
+
+class Draw:
+    """
+    drawing service
+    """
+    def __init__(self, api):
+        self.api = api
+
+    def on_get(self, req, resp):
+        pass
+
+
+def make_api():
+    api = Falibrary(title='spec')
+
+    class Circle:
+        @api.validate(data=Shape)
+        def on_post(self, req, resp):
+            pass
+
+    app = falcon.API()
+    app.add_route('/circle', Circle())
+    api.register(app)
+    return api, app
+
+
+def test_spec_add_route_later():
+    api, app = make_api()
+    spec = api.spec
+    assert '/circle' in spec['paths']
+    assert api.spec is spec, 'spec should be cached'
+
+    operation = spec['paths']['/circle']['post']
+    app.add_route('/draw/{uid}', Draw(api))
+    spec = api.spec
+    assert '/draw/{uid}' in spec['paths']
+    assert spec['paths']['/circle']['post'] is operation, 'operation should be reused'
+
+
+def test_spec_nested_models():
+    api, _ = make_api()
+    schemas = api.spec['components']['schemas']
+    assert schemas['Shape']['properties']['center'] == {'$ref': '#/components/schemas/Point'}
+    assert 'Point' in schemas
+    api.update_config(title='new title')
+    spec = api.spec
+    assert spec['info']['title'] == 'new title'
+    assert 'Point' in spec['components']['schemas']
+
+
+def test_registry_same_name():
+    api, app = make_api()
+    other = type('Shape', (BaseModel,), {'__annotations__': {'name': str}})
+    other.__module__ = 'another.module'
+
+    class Other:
+        @api.validate(resp=other)
+        def on_get(self, req, resp):
+            pass
+
+    app.add_route('/other', Other())
+    spec = api.spec
+    schemas = spec['components']['schemas']
+    refs = {
+        spec['paths']['/circle']['post']['requestBody']['content']['application/json']
+        ['schema']['$ref'],
+        spec['paths']['/other']['get']['responses']['200']['content']['application/json']
+        ['schema']['$ref'],
+    }
+    assert len(refs) == 2
+    for ref in refs:
+        assert ref.rsplit('/', 1)[1] in schemas
+
+
+def test_spec_invalidate():
+    api, _ = make_api()
+    spec = api.spec
+    body = api.spec_body
+    api.invalidate()
+    assert api.spec is not spec
+    assert api.spec == spec
+    assert api.spec_body is not body
+    assert api.spec_body.etag == body.etag
+
+
+def test_registry_factory_models():
+    api = Falibrary()
+
+    def make(field):
+        class Item(BaseModel):
+            __annotations__ = {field: int}
+
+        class Resource:
+            @api.validate(resp=Item)
+            def on_get(self, req, resp):
+                pass
+        return Resource()
+
+    app = falcon.API()
+    app.add_route('/a', make('a'))
+    app.add_route('/b', make('b'))
+    api.register(app)
+    spec = api.spec
+    schemas = spec['components']['schemas']
+    fields = []
+    for path in ('/a', '/b'):
+        ref = (spec['paths'][path]['get']['responses']['200']['content']
+               ['application/json']['schema']['$ref'])
+        fields.append(list(schemas[ref.rsplit('/', 1)[1]]['properties']))
+    assert fields == [['a'], ['b']]
@@ -0,0 +1,79 @@
+import falcon
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+
+
+class Item(BaseModel):
+    name: str
+
+
+class User(BaseModel):
+    name: str
+    items: list = []
+
+
+class Profile(BaseModel):
+    user: User
+
+
+api = Falibrary(split_spec=True)
+
+
+class Items:
+    @api.validate(data=Item, tags=['item'])
+    def on_post(self, req, resp):
+        pass
+
+
+class Users:
+    @api.validate(resp=Profile, tags=['user'])
+    def on_get(self, req, resp):
+        pass
+
+
+app = falcon.API()
+app.add_route('/items', Items())
+app.add_route('/users', Users())
+api.register(app)
+client = testing.TestClient(app)
+
+
+def test_index():
+    resp = client.simulate_get('/apidoc/tags.json')
+    assert resp.status_code == 200
+    assert resp.json['spec'] == '/apidoc/openapi.json'
+    assert [(tag['name'], tag['url'], tag['operations']) for tag in resp.json['tags']] == [
+        ('item', '/apidoc/openapi/item.json', 1),
+        ('user', '/apidoc/openapi/user.json', 1),
+    ]
+
+
+def test_tag_spec():
+    spec = client.simulate_get('/apidoc/openapi/user.json').json
+    assert list(spec['paths']) == ['/users']
+    assert [tag['name'] for tag in spec['tags']] == ['user']
+    # NOTE nested models are kept
+    assert set(spec['components']['schemas']) == {'Profile', 'User'}
+
+    resp = client.simulate_get('/apidoc/openapi/item.json')
+    assert set(resp.json['components']['schemas']) == {'Item'}
+    etag = resp.headers['etag']
+    resp = client.simulate_get('/apidoc/openapi/item.json', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+
+    assert client.simulate_get('/apidoc/openapi/missing.json').status_code == 404
+
+
+def test_doc_page():
+    page = client.simulate_get('/apidoc').text
+    assert "fetch('/apidoc/tags.json')" in page
+    assert '/apidoc' not in ''.join(api.spec['paths'])
+
+
+def test_updated():
+    api.spec
+    app.add_route('/more', Items())
+    spec = client.simulate_get('/apidoc/openapi/item.json').json
+    assert set(spec['paths']) == {'/items', '/more'}
@@ -0,0 +1,94 @@
+import io
+import json
+
+import falcon
+import pytest
+from falcon import testing
+from pydantic import BaseModel
+
+from falibrary import Falibrary
+from falibrary.stream import iter_json_array
+
+
+class Record(BaseModel):
+    uid: int
+    name: str
+
+
+api = Falibrary()
+
+
+class Ingest:
+    @api.validate(data=Record, stream=True)
+    def on_post(self, req, resp):
+        total = 0
+        for record in req.context.data:
+            assert isinstance(record, Record)
+            total += record.uid
+        resp.media = {'total': total}
+
+
+class Export:
+    @api.validate(resp=Record)
+    def on_get(self, req, resp):
+        count = int(req.get_param('count', default=3))
+        for i in range(count):
+            if i % 2:
+                yield {'uid': i, 'name': f'n{i}'}
+            else:
+                yield Record(uid=i, name=f'n{i}')
+
+
+app = falcon.API()
+app.add_route('/ingest', Ingest())
+app.add_route('/export', Export())
+api.register(app)
+client = testing.TestClient(app)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_iter_json_array(chunk_size):
+    items = [{'a': 'é' * 10}, 12345, 3.5e10, [1, [2]], 'text', None, True]
+    body = json.dumps(items, ensure_ascii=False).encode('utf-8')
+    assert list(iter_json_array(io.BytesIO(body), chunk_size)) == items
+    assert list(iter_json_array(io.BytesIO(b' [ ] '), chunk_size)) == []
+
+
+@pytest.mark.parametrize('body', [b'', b'{}', b'[1,', b'[1 2]', b'[1]x', b'[1,]'])
+def test_iter_json_array_invalid(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(body), 2))
+
+
+def test_stream_route():
+    records = [{'uid': i, 'name': f'n{i}'} for i in range(100)]
+    resp = client.simulate_post('/ingest', json=records)
+    assert resp.json == {'total': sum(range(100))}
+
+    records[42] = {'uid': 'x', 'name': 'bad'}
+    resp = client.simulate_post('/ingest', json=records)
+    assert resp.status_code == 422
+    assert 'item 42' in resp.json['description']
+
+    assert client.simulate_post('/ingest', body='{"uid": 1}').status_code == 400
+
+
+def test_stream_spec():
+    body = api.spec['paths']['/ingest']['post']['requestBody']
+    schema = body['content']['application/json']['schema']
+    assert schema == {'type': 'array', 'items': {'$ref': '#/components/schemas/Record'}}
+
+
+def test_stream_response():
+    resp = client.simulate_get('/export', params={'count': 5000})
+    assert resp.headers['content-type'] == falcon.MEDIA_JSON
+    assert resp.json == [{'uid': i, 'name': f'n{i}'} for i in range(5000)]
+
+    resp = client.simulate_get('/export', params={'count': 0})
+    assert resp.json == []
+
+    resp = client.simulate_get('/export', headers={'Accept': 'application/x-ndjson'})
+    assert resp.headers['content-type'] == 'application/x-ndjson'
+    lines = resp.text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'uid': i, 'name': f'n{i}'} for i in range(3)]
@@ -1,4 +1,7 @@
-from falibrary.utils import parse_path
+import falcon
+
+from falibrary import Falibrary
+from falibrary.utils import parse_path, cache_info, cache_clear, RouteIndex
 
 
 def test_parse():
@@ -7,3 +10,65 @@ def test_parse():
     path, param = parse_path(uri)
     assert path == uri, "Path fault"
     assert param == [], "Param Fault"
+
+
+def test_parse_cache():
+    cache_clear()
+    uri = '/api/{uid:int(min=1)}/{name}'
+    path, param = parse_path(uri)
+    assert path == '/api/{uid}/{name}'
+    assert [p['name'] for p in param] == ['uid', 'name']
+    param.append('mutated')
+    assert parse_path(uri)[1] == param[:-1], 'cached result should not be mutated'
+    info = cache_info()['parse_path']
+    assert (info.hits, info.misses) == (1, 1)
+
+
+class Tenant:
+    """
+    tenant resource
+    """
+    def on_get(self, req, resp):
+        """
+        summary
+
+        description
+        """
+
+
+def test_multi_tenant_cache():
+    cache_clear()
+    for _ in range(3):
+        api = Falibrary()
+        app = falcon.API()
+        app.add_route('/tenant/{uid}', Tenant())
+        api.register(app)
+        operation = api.spec['paths']['/tenant/{uid}']['get']
+        assert operation['summary'] == 'summary'
+        assert operation['description'] == 'description'
+
+    info = cache_info()
+    assert info['parse_path'].misses == 1
+    assert info['parse_path'].hits == 2
+    assert info['summary_desc'].hits == 2
+    assert info['class_doc'].misses == 1
+
+
+class DocPage:
+    def on_get(self, req, resp):
+        pass
+
+
+def test_route_index():
+    app = falcon.API()
+    api = Falibrary(app, mode='greedy')
+    app.add_route('/a', DocPage())
+    app.add_route('/a/{uid}', Tenant())
+    app.add_route('/b', DocPage())
+
+    index = RouteIndex(app._router._roots)
+    # NOTE a user class named like the document resources is not skipped
+    assert [route.uri_template for route in index] == ['/a', '/a/{uid}', '/b']
+    assert list(index.get('/a').method_map) == ['GET']
+    assert api.route_index.get('/apidoc') is None
+    assert set(api.spec['paths']['/a']) == {'get'}